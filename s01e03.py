@@ -1,5 +1,7 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from utilities.common import AIDevsClient, OpenAIClient
+from utilities.expressions import evaluate_many
 from utilities.config import S01E03_TASK_URL, AI_DEVS_API_KEY, S01E03_REPORT_URL
 
 # Initialize clients
@@ -11,6 +13,16 @@ TASK_NAME = "JSON"
 API_KEY = AI_DEVS_API_KEY
 DATA_URL = S01E03_TASK_URL
 SUBMIT_URL = S01E03_REPORT_URL
+MAX_WORKERS = 8  # Concurrent LLM requests for open questions
+
+def answer_open_question(question):
+    """Ask the LLM for a very short answer to an open question."""
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant that provides very short answers to user questions."},
+        {"role": "user", "content": question}
+    ]
+    llm_answer = client_openai.get_completion(messages=messages, model="gpt-4o-mini", temperature=0.1)
+    return llm_answer.strip() if llm_answer else ""
 
 def main():
     # Step 1: Retrieve data using the client method
@@ -21,25 +33,25 @@ def main():
         data_str = ''.join(data)
         data_json = json.loads(data_str)
 
-        # Process test data
-        for item in data_json.get('test-data', []):
-            if 'test' in item:
-                # Query LLM for conceptual questions
-                test_question = item['test'].get('q')
-                messages = [
-                    {"role": "system", "content": "You are a helpful assistant that provides very short answers to user questions."},
-                    {"role": "user", "content": test_question}
-                ]
-                llm_answer = client_openai.get_completion(messages=messages, model="gpt-4o-mini", temperature=0.1).strip()
-                print(f"Test question: {test_question}, LLM Answer: {llm_answer}")
-                item['test']['a'] = llm_answer
-            else:
-                # Evaluate mathematical expressions
-                question = item.get('question')
-                correct_answer = eval(question)
-                if item.get('answer') != correct_answer:
-                    print(f"Correcting: {question} from {item['answer']} to {correct_answer}")
-                    item['answer'] = correct_answer
+        test_data = data_json.get('test-data', [])
+
+        # Answer each distinct open question once, concurrently, then fan the answers out
+        test_items = [item for item in test_data if 'test' in item]
+        unique_questions = list(dict.fromkeys(item['test'].get('q') for item in test_items))
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            llm_answers = dict(zip(unique_questions, executor.map(answer_open_question, unique_questions)))
+        for test_question, llm_answer in llm_answers.items():
+            print(f"Test question: {test_question}, LLM Answer: {llm_answer}")
+        for item in test_items:
+            item['test']['a'] = llm_answers[item['test'].get('q')]
+
+        # Evaluate mathematical expressions as one column
+        arithmetic_items = [item for item in test_data if 'test' not in item]
+        correct_answers = evaluate_many([item.get('question') for item in arithmetic_items])
+        for item, correct_answer in zip(arithmetic_items, correct_answers):
+            if item.get('answer') != correct_answer:
+                print(f"Correcting: {item['question']} from {item['answer']} to {correct_answer}")
+                item['answer'] = correct_answer
 
         # Prepare the complete payload
         payload = {
@@ -1,6 +1,7 @@
 import os
 import requests
 import zipfile
+from utilities.audio import AudioSegmenter, format_segments
 from utilities.common import OpenAIClient, AIDevsClient
 from utilities.config import AI_DEVS_API_KEY, S02E01_TASK_URL, S02E01_REPORT_URL
 
@@ -11,11 +12,15 @@ def main():
     ZIP_PATH = "s02e01/przesluchania.zip"
     AUDIO_FOLDER = "s02e01"
     OUTPUT_FILE_PATH = "s02e01/transcripts.txt"
+    TIMESTAMPED_FILE_PATH = "s02e01/transcripts_timestamped.txt"
+    MAX_CHUNK_SECONDS = 120  # Recordings are split at pauses into chunks of at most this length
+    MAX_WORKERS = 4
     SUBMIT_URL = S02E01_REPORT_URL
 
     # Initialize clients
     client_aidevs = AIDevsClient()
     client_openai = OpenAIClient()
+    segmenter = AudioSegmenter(client_openai, max_chunk_seconds=MAX_CHUNK_SECONDS, max_workers=MAX_WORKERS)
 
     # Ensure the directory for the ZIP file exists
     os.makedirs(os.path.dirname(ZIP_PATH), exist_ok=True)
@@ -35,18 +40,24 @@ def main():
         zip_ref.extractall(AUDIO_FOLDER)
     print(f"Files extracted to folder: {AUDIO_FOLDER}")
 
-    # Step 2: Transcribe audio files
+    # Step 2: Transcribe audio files (chunks of all recordings share one pool of MAX_WORKERS uploads)
+    audio_files = sorted(f for f in os.listdir(AUDIO_FOLDER) if f.endswith(('.mp3', '.wav', '.m4a')))
+    results = segmenter.transcribe_many(os.path.join(AUDIO_FOLDER, f) for f in audio_files)
+    responses = {audio_file: results[os.path.join(AUDIO_FOLDER, audio_file)] for audio_file in audio_files}
+
     transcripts = {}
-    for audio_file in os.listdir(AUDIO_FOLDER):
-        if audio_file.endswith(('.mp3', '.wav', '.m4a')):
-            audio_path = os.path.join(AUDIO_FOLDER, audio_file)
-            print(f"Processing file: {audio_file}")
-            audio_response = client_openai.transcribe(audio_path)
-            if audio_response and "text" in audio_response:
-                transcripts[audio_file] = audio_response["text"]
-                print(f"Transcription for {audio_file}: {audio_response['text']}")
-            else:
-                print(f"Error processing {audio_file}.")
+    timestamped = {}
+    for audio_file, audio_response in responses.items():
+        if audio_response and audio_response["text"]:
+            transcripts[audio_file] = audio_response["text"]
+            timestamped[audio_file] = format_segments(audio_response["segments"])
+            print(f"Transcription for {audio_file}: {audio_response['text']}")
+        else:
+            print(f"Error processing {audio_file}.")
+
+    with open(TIMESTAMPED_FILE_PATH, "w", encoding="utf-8") as output_file:
+        for audio_file, transcript in timestamped.items():
+            output_file.write(f"Transcription for {audio_file}:\n{transcript}\n\n")
 
     # Step 3: Write transcripts to a file
     with open(OUTPUT_FILE_PATH, "w", encoding="utf-8") as output_file:
@@ -3,8 +3,8 @@ from utilities.config import AI_DEVS_API_KEY, S02E04_TASK_URL, S02E04_REPORT_URL
 import requests
 import zipfile
 import os
-import base64
 import shutil
+from utilities.vision import VisionCache
 
 # =========================================================
 # Configuration
@@ -17,7 +17,7 @@ SUBMIT_URL = S02E04_REPORT_URL
 
 # Initialize clients
 client_aidevs = AIDevsClient()
-client_openai = OpenAIClient()
+client_openai = OpenAIClient(vision_cache=VisionCache())
 
 # =========================================================
 # Step 2: Helper functions
@@ -31,15 +31,14 @@ def get_file_content(file_path):
         elif file_path.endswith(('.mp3', '.wav')):
             return client_openai.transcribe(file_path).get('text', '') 
         elif file_path.endswith('.png'):
-            encoded_data = base64.b64encode(open(file_path, "rb").read()).decode('utf-8')
-            messages = [{
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": "Czy ten obraz zawiera informacje o ludziach, którzy zostali schwytani i są gdzieś przetrzymywani czy o naprawionych usterkach hardwarowych (wyklucz aktualizacje modułu AI)? Opisz w szczegółach."},
-                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{encoded_data}"}}
-                ]
-            }]
-            return client_openai.get_completion(messages=messages, model="gpt-4o", temperature=0.1)
+            with open(file_path, "rb") as f:
+                image_bytes = f.read()
+            return client_openai.describe_image(
+                image_bytes,
+                "Czy ten obraz zawiera informacje o ludziach, którzy zostali schwytani i są gdzieś przetrzymywani czy o naprawionych usterkach hardwarowych (wyklucz aktualizacje modułu AI)? Opisz w szczegółach.",
+                model="gpt-4o",
+                temperature=0.1
+            )
     except Exception as e:
         print(f"Error processing file {file_path}: {e}")
     return ''
@@ -106,6 +105,7 @@ def main():
 
     categories = {k: sorted(v) for k, v in categories.items()}
     print(categories)
+    print(client_openai.vision_cache.report())
 
     # =========================================================
     # Step 4: Submit answer
@@ -1,8 +1,15 @@
+import hashlib
+import json
 import os
-import base64
 import requests
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from bs4 import BeautifulSoup, NavigableString
+from utilities.cache import DiskCache
 from utilities.common import AIDevsClient, OpenAIClient
+from utilities.condense import estimate_tokens
+from utilities.retrieval import BM25Index, chunk_text
+from utilities.vision import VisionCache
 from utilities.config import AI_DEVS_API_KEY, S02E05_DATA_URL, S02E05_TASK_URL, S02E05_REPORT_URL
 
 # =========================================================
@@ -14,7 +21,16 @@ def get_config():
         'article_url': S02E05_DATA_URL,
         'questions_url': S02E05_TASK_URL,
         'submit_url': S02E05_REPORT_URL,
-        'data_folder': "s02e05"
+        'data_folder': "s02e05",
+        'max_media_workers': 4,
+        'cache_path': "s02e05/cache.sqlite",
+        # "rag" answers each question from retrieved passages, "full" sends the whole article,
+        # "auto" uses "full" while the article fits in 'max_full_tokens'
+        'answer_mode': "rag",
+        'max_full_tokens': 60000,
+        'chunk_chars': 1200,
+        'top_k_chunks': 4,
+        'max_answer_workers': 4
     }
 
 # =========================================================
@@ -30,88 +46,274 @@ def download_and_save_media(url, folder, filename):
         return path
     return None
 
-def node_to_markdown(node, base_url, data_folder, openai_client, images_content, audio_content):
-    """Recursively convert HTML node to Markdown, inserting image/audio descriptions inline."""
+def fetch_article_html(url, article_cache):
+    """Fetch the article HTML, revalidating the cached copy with its ETag."""
+    cached = article_cache.get(url, None)
+    headers = {'If-None-Match': cached['etag']} if cached and cached.get('etag') else {}
+    response = requests.get(url, headers=headers)
+    if response.status_code == 304 and cached:
+        return cached['html']
+    response.raise_for_status()
+    article_cache.set(url, {'etag': response.headers.get('ETag'), 'html': response.text})
+    return response.text
+
+def media_url(node, base_url):
+    """Return (kind, absolute URL) for an <img> or <audio> node, or None for other nodes."""
+    if isinstance(node, NavigableString):
+        return None
+    if node.name == 'img':
+        kind, url = 'image', node.get('src')
+    elif node.name == 'audio':
+        audio_source = node.find('source')
+        kind, url = 'audio', audio_source.get('src') if audio_source else node.get('src')
+    else:
+        return None
+    if not url:
+        return None
+    if not url.startswith(('http://', 'https://')):
+        url = base_url + url
+    return kind, url
+
+def collect_media(root, base_url):
+    """First pass: list the media of a document in order, each URL once."""
+    media = {}
+    for node in root.find_all(['img', 'audio']):
+        found = media_url(node, base_url)
+        if found:
+            media.setdefault(found[1], found[0])
+    return [(kind, url) for url, kind in media.items()]
+
+def resolve_media(kind, url, data_folder, openai_client, media_cache=None):
+    """
+    Download one media file and describe (image) or transcribe (audio) it.
+
+    Results are cached by URL and content hash, so unchanged media is never sent to the
+    model twice.
+    """
+    path = download_and_save_media(url, data_folder, os.path.basename(url))
+    if not path:
+        return None
+    with open(path, "rb") as f:
+        content = f.read()
+
+    def compute(_key):
+        if kind == 'image':
+            return openai_client.describe_image(
+                content, "Describe this image in detail.", model="gpt-4o", mime_type="image/jpeg", temperature=0.1,
+                cache_mode="near"
+            )
+        transcription = openai_client.transcribe(path)
+        return transcription.get('text', '') if transcription else None
+
+    if media_cache is None:
+        return compute(None)
+    key = f"{kind}:{url}:{hashlib.sha256(content).hexdigest()}"
+    return media_cache.get_or_set(key, compute, is_negative=lambda _: False)
+
+def resolve_all_media(media, data_folder, openai_client, max_workers=4, media_cache=None):
+    """Second pass: resolve all media concurrently through a bounded pool, keyed by URL."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda item: resolve_media(*item, data_folder, openai_client, media_cache), media)
+        return {url: result for (_, url), result in zip(media, results)}
+
+def node_to_markdown(node, base_url, media_results):
+    """Recursively convert HTML node to Markdown, inserting resolved image/audio content inline."""
     parts = []
     if isinstance(node, NavigableString):
         text = node.strip()
         if text:
             parts.append(text)
-    else:
-        # It's a tag
-        if node.name == 'img':
-            # Process image
-            img_url = node.get('src')
-            if img_url and not img_url.startswith(('http://', 'https://')):
-                img_url = base_url + img_url
-            
-            img_path = download_and_save_media(img_url, data_folder, os.path.basename(img_url))
-            if img_path:
-                encoded_image = base64.b64encode(open(img_path, "rb").read()).decode('utf-8')
-                messages = [{
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": "Describe this image in detail."},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{encoded_image}"}}
-                    ]
-                }]
-                image_description = openai_client.get_completion(messages=messages, model="gpt-4o", temperature=0.1)
-                images_content.append(image_description)  # Keep track
+        return "".join(parts)
+
+    found = media_url(node, base_url)
+    if found:
+        kind, url = found
+        content = media_results.get(url)
+        if content is not None:
+            if kind == 'image':
                 # Insert inline image description
-                parts.append(f"\n\n> {image_description}\n\n")
-
-        elif node.name == 'audio':
-            # Process audio
-            audio_source = node.find('source')
-            audio_url = audio_source.get('src') if audio_source else node.get('src')
-            if audio_url and not audio_url.startswith(('http://', 'https://')):
-                audio_url = base_url + audio_url
-
-            audio_path = download_and_save_media(audio_url, data_folder, os.path.basename(audio_url))
-            if audio_path:
-                transcript = openai_client.transcribe(audio_path).get('text', '')
-                audio_content.append(transcript)  # Keep track
+                parts.append(f"\n\n> {content}\n\n")
+            else:
                 # Insert inline audio transcript as code block
-                parts.append(f"\n\n```\n{transcript}\n```\n\n")
+                parts.append(f"\n\n```\n{content}\n```\n\n")
+    elif node.name not in ('img', 'audio'):
+        # For other tags, process children
+        for child in node.children:
+            parts.append(node_to_markdown(child, base_url, media_results))
 
-        else:
-            # For other tags, process children
-            for child in node.children:
-                parts.append(node_to_markdown(child, base_url, data_folder, openai_client, images_content, audio_content))
-
-            # Add a paragraph break after certain block-level elements
-            if node.name in ['p', 'div', 'section', 'article', 'br']:
-                parts.append("\n\n")
+        # Add a paragraph break after certain block-level elements
+        if node.name in ['p', 'div', 'section', 'article', 'br']:
+            parts.append("\n\n")
 
     return "".join(parts)
 
 def process_article(config, client_openai):
-    """Process the article and produce a Markdown file with images and audio inline."""
-    response = requests.get(config['article_url'] + "arxiv-draft.html")
-    soup = BeautifulSoup(response.text, 'html.parser')
-    base_url = config['article_url']  # Base URL for relative paths
+    """
+    Process the article and produce Markdown with images and audio inline.
+
+    The conversion is cached by the hash of the article HTML (revalidated with its
+    ETag), so an unchanged article is neither re-downloaded nor re-converted.
 
-    images_content = []
-    audio_content = []
+    :return: Dictionary with the Markdown 'text' and the 'images' and 'audio' contents.
+    """
+    article_cache = DiskCache(config['cache_path'], namespace="article")
+    markdown_cache = DiskCache(config['cache_path'], namespace="markdown")
+    media_cache = DiskCache(config['cache_path'], namespace="media")
+
+    html = fetch_article_html(config['article_url'] + "arxiv-draft.html", article_cache)
+    html_hash = hashlib.sha256(html.encode('utf-8')).hexdigest()
+    cached = markdown_cache.get(html_hash, None)
+    if cached is not None:
+        return cached
+
+    soup = BeautifulSoup(html, 'html.parser')
+    base_url = config['article_url']  # Base URL for relative paths
 
-    # Convert the entire body into Markdown
     body = soup.find('body')
     if not body:
         body = soup  # fallback if no body tag
 
-    markdown_content = node_to_markdown(body, base_url, config['data_folder'], client_openai, images_content, audio_content)
+    # Resolve every media item up front, concurrently, then render the Markdown
+    media = collect_media(body, base_url)
+    media_results = resolve_all_media(
+        media, config['data_folder'], client_openai, config['max_media_workers'], media_cache
+    )
+    images_content = [media_results[url] for kind, url in media if kind == 'image' and media_results[url] is not None]
+    audio_content = [media_results[url] for kind, url in media if kind == 'audio' and media_results[url] is not None]
 
-    # Create Markdown file
-    md_filename = os.path.join(config['data_folder'], "article_content.md")
-    with open(md_filename, 'w', encoding='utf-8') as md_file:
-        md_file.write("# Article Content\n\n")
-        md_file.write(markdown_content.strip() + "\n")
+    markdown_content = node_to_markdown(body, base_url, media_results)
 
-    return {
-        'text': markdown_content,
+    result = {
+        'text': markdown_content.strip(),
         'images': images_content,
         'audio': audio_content
     }
+    # Conversions with unresolved media are retried on the next run
+    if all(content is not None for content in media_results.values()):
+        markdown_cache.set(html_hash, result)
+    return result
+
+def normalize_embeddings(embeddings):
+    """Stack embeddings into a matrix of unit rows (zero rows for failed embeddings)."""
+    dimensions = next((len(embedding) for embedding in embeddings if embedding is not None), 0)
+    vectors = np.array([embedding if embedding is not None else [0.0] * dimensions for embedding in embeddings],
+                       dtype=np.float32).reshape(len(embeddings), dimensions)
+    return vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12)
+
+def build_article_index(markdown, chunk_chars, openai_client):
+    """
+    Split the article into overlapping chunks, index them with BM25 and embed them.
+
+    The Polish questions share few words with the English media descriptions, so
+    retrieval also uses (multilingual) embeddings.
+
+    :return: Tuple (BM25Index, matrix of unit chunk embeddings in chunk id order).
+    """
+    index = BM25Index()
+    chunks = chunk_text(markdown, max_chars=chunk_chars)
+    for chunk_id, chunk in enumerate(chunks):
+        index.add(chunk_id, chunk)
+    return index, normalize_embeddings(openai_client.create_embeddings_batch(chunks))
+
+def retrieve_passages(question, question_vector, index, chunk_vectors, top_k, rrf_k=60):
+    """
+    Pick the top-k chunks for a question by reciprocal rank fusion of BM25 and embedding similarity.
+
+    :return: List of chunk ids, best first.
+    """
+    rankings = [[chunk_id for chunk_id, _ in index.search(question, k=len(index))]]
+    if question_vector is not None and chunk_vectors.size:
+        rankings.append(np.argsort(-(chunk_vectors @ question_vector)).tolist())
+    scores = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1 / (rrf_k + rank + 1)
+    ranked = sorted(scores, key=lambda chunk_id: -scores[chunk_id])
+    return ranked[:top_k] or list(range(min(top_k, len(index))))
+
+def answer_question(question_id, question, question_vector, index, chunk_vectors, openai_client, top_k):
+    """Answer one question from its top-k retrieved passages; returns the answer or None."""
+    hits = retrieve_passages(question, question_vector, index, chunk_vectors, top_k)
+    # Passages are given in article order, which keeps the narrative coherent
+    passages = "\n\n---\n\n".join(index.documents[chunk_id] for chunk_id in sorted(hits))
+
+    messages = [{
+        "role": "system",
+        "content": "You are an AI assistant helping to answer questions about Professor Maj's article. "
+                  "Provide a concise, one-sentence answer strictly based on the provided passages. "
+                  f"Respond only with JSON like: {{\"{question_id}\": \"answer\"}}"
+    }, {
+        "role": "user",
+        "content": f"Passages:\n{passages}\n\nQuestion {question_id}: {question}"
+    }]
+    response = openai_client.get_completion(
+        messages=messages,
+        model="gpt-4o",
+        temperature=0.1
+    )
+    parsed = parse_json_reply(response)
+    if parsed is None:
+        print(f"Could not parse answer to question {question_id}: {response}")
+        return None
+    return parsed.get(question_id)
+
+def answer_questions_rag(questions, markdown, openai_client, config):
+    """Answer all questions concurrently, each from passages retrieved from the article."""
+    index, chunk_vectors = build_article_index(markdown, config['chunk_chars'], openai_client)
+    # All questions are embedded in one request; failed embeddings fall back to BM25 alone
+    question_embeddings = openai_client.create_embeddings_batch(list(questions.values()))
+    question_vectors = {
+        question_id: None if embedding is None else vector
+        for question_id, embedding, vector in zip(questions, question_embeddings, normalize_embeddings(question_embeddings))
+    }
+    with ThreadPoolExecutor(max_workers=config['max_answer_workers']) as executor:
+        answers = executor.map(
+            lambda item: answer_question(
+                *item, question_vectors[item[0]], index, chunk_vectors, openai_client, config['top_k_chunks']
+            ),
+            questions.items()
+        )
+        return {question_id: answer for question_id, answer in zip(questions, answers) if answer}
+
+def parse_json_reply(response):
+    """Parse a JSON object from a model reply, tolerating a Markdown code fence; returns a dict or None."""
+    try:
+        reply = response.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+        parsed = json.loads(reply)
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+def answer_questions_full(questions, markdown, openai_client):
+    """Answer all questions in one prompt holding the whole article, keyed by question ID."""
+    messages = [{
+        "role": "system",
+        "content": "You are an AI assistant helping to answer questions about Professor Maj's article. "
+                  "Provide concise, one-sentence answers strictly based on the provided context. "
+                  "Respond only with a JSON object mapping each question ID to its answer, "
+                  "like: {\"01\": \"answer\", \"02\": \"answer\"}"
+    }, {
+        "role": "user",
+        "content": f"""Here is the content from the article:
+
+Context:
+{markdown}
+
+Please answer these questions with one sentence each:
+{chr(10).join(f"{question_id}: {question}" for question_id, question in questions.items())}"""
+    }]
+
+    answers = openai_client.get_completion(
+        messages=messages,
+        model="gpt-4o",
+        temperature=0.1
+    )
+
+    parsed = parse_json_reply(answers)
+    if parsed is None:
+        print(f"Could not parse answers: {answers}")
+        return {}
+    return {question_id: parsed[question_id] for question_id in questions if parsed.get(question_id)}
 
 def get_questions(config):
     """Fetch questions from the API."""
@@ -131,52 +333,37 @@ def get_questions(config):
 
 def main():
     # Initialize clients
-    client_aidevs = AIDevsClient()
-    client_openai = OpenAIClient()
-    
     # Get configuration
     config = get_config()
 
+    client_aidevs = AIDevsClient()
+    client_openai = OpenAIClient(
+        vision_cache=VisionCache(), embedding_cache=DiskCache(config['cache_path'], namespace="embeddings")
+    )
+
     # Process article
-    article_content = process_article(config, client_openai)
+    article = process_article(config, client_openai)
+    print(client_openai.vision_cache.report())
 
     # Get questions
     questions = get_questions(config)
     print(questions)
 
-    # Read context from article_content.md
-    article_content = open(os.path.join(config['data_folder'], "article_content.md"), "r").read()
+    article_content = article['text']
 
     if questions:
-        # Generate answers using GPT-4
-        messages = [{
-            "role": "system",
-            "content": "You are an AI assistant helping to answer questions about Professor Maj's article. "
-                      "Provide concise, one-sentence answers strictly based on the provided context."
-                      "Format your answers as a simple list, one per line."
-        }, {
-            "role": "user",
-            "content": f"""Here is the content from the article:
-
-Context:
-{article_content}
-
-Please answer these questions with one sentence each:
-{questions}"""
-        }]
-
-        answers = client_openai.get_completion(
-            messages=messages,
-            model="gpt-4o",
-            temperature=0.1
-        )
+        answer_mode = config['answer_mode']
+        if answer_mode == "auto":
+            answer_mode = "full" if estimate_tokens(article_content) <= config['max_full_tokens'] else "rag"
+        print(f"Answer mode: {answer_mode}")
+        if answer_mode == "rag":
+            answers = answer_questions_rag(questions, article_content, client_openai, config)
+        else:
+            answers = answer_questions_full(questions, article_content, client_openai)
 
-        # Parse answers into required format
-        answers_list = [answer.strip() for answer in answers.split('\n') if answer.strip()]
-        
         # Create formatted answer dictionary
         formatted_answer = {}
-        for question_id, answer in zip(questions.keys(), answers_list):
+        for question_id, answer in answers.items():
             numeric_id = question_id.split('_')[-1]
             formatted_id = f"{int(numeric_id):02d}"
             formatted_answer[formatted_id] = answer
@@ -1,9 +1,9 @@
-import base64
 import os
 import requests
 import zipfile
 import shutil
 from utilities.common import AIDevsClient, OpenAIClient
+from utilities.vision import VisionCache
 from utilities.config import AI_DEVS_API_KEY, S03E01_TASK_URL, S03E01_REPORT_URL
 
 # =========================================================
@@ -40,15 +40,11 @@ def read_file_content(path):
             return client_openai.transcribe(path).get('text', '')
         
         if path.endswith('.png'):
-            encoded = base64.b64encode(open(path, "rb").read()).decode('utf-8')
-            return client_openai.get_completion(
-                messages=[{
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": "Dokładnie opisz wszystkie detale obrazka. Odczytaj wszystkie teksty i elementy graficzne."},
-                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{encoded}"}}
-                    ]
-                }],
+            with open(path, "rb") as f:
+                image_bytes = f.read()
+            return client_openai.describe_image(
+                image_bytes,
+                "Dokładnie opisz wszystkie detale obrazka. Odczytaj wszystkie teksty i elementy graficzne.",
                 model="gpt-4o-mini",
                 temperature=0.1
             )
@@ -96,9 +92,11 @@ def generate_keywords(content, facts_summary, client_openai):
     ).strip()
 
 def main():
+    global client_openai
+
     # Initialize clients
     client_aidevs = AIDevsClient()
-    client_openai = OpenAIClient()
+    client_openai = OpenAIClient(vision_cache=VisionCache())
 
     # Clean and prepare directories
     if os.path.exists(os.path.dirname(ZIP_PATH)):
@@ -144,6 +142,7 @@ def main():
             keywords_dict[file] = keywords
 
     print("Generated keywords:", keywords_dict)
+    print(client_openai.vision_cache.report())
 
     # Submit answer
     payload = {
@@ -1,9 +1,8 @@
-# Standard library imports
-import requests
-
 # Local imports
 from utilities.common import AIDevsClient, OpenAIClient
 from utilities.config import AI_DEVS_API_KEY, S03E03_TASK_URL, S03E03_REPORT_URL
+from utilities.database import DatabaseClient, SchemaCatalog
+from utilities.mirror import LocalMirror
 
 # =========================================================
 # Configuration
@@ -11,42 +10,28 @@ from utilities.config import AI_DEVS_API_KEY, S03E03_TASK_URL, S03E03_REPORT_URL
 SUBMIT_URL = S03E03_REPORT_URL
 TASK_NAME = "database"
 API_URL = S03E03_TASK_URL
+SCHEMA_CATALOG_PATH = "s03e03/schema_catalog.json"
+SCHEMA_CATALOG_TTL = 24 * 3600
+# Run generated queries against a local SQLite copy instead of the remote API
+USE_LOCAL_MIRROR = True
+MIRROR_PATH = "s03e03/mirror.sqlite"
 
-def get_table_info():
-    """Get database table structures."""
-    # First get list of tables
-    payload = {
-        "task": TASK_NAME,
-        "apikey": AI_DEVS_API_KEY,
-        "query": "show tables"
-    }
-    response = requests.post(API_URL, json=payload).json()
-    
-    # Extract table names dynamically by getting the first key from the first dictionary
-    if 'reply' in response and response['reply']:
-        table_key = list(response['reply'][0].keys())[0]  # Gets the first (and only) key dynamically
-        tables = [table[table_key] for table in response['reply']]
-        print("Tables:", tables)
-        
-        # Then get structure for each table
-        table_structures = {}
-        for table in tables:
-            payload["query"] = f"show create table {table}"
-            structure = requests.post(API_URL, json=payload).json()
-            print(f"\nStructure for {table}:", structure)
-            if 'reply' in structure:
-                table_structures[table] = structure
-        
-        return table_structures
-    
-    return None
+def get_table_info(db_client):
+    """Get database table structures from the persistent schema catalog."""
+    catalog = SchemaCatalog(db_client, SCHEMA_CATALOG_PATH, ttl=SCHEMA_CATALOG_TTL)
+    if not catalog.load():
+        return None
+
+    print("Tables:", list(catalog.tables))
+    return catalog.to_prompt()
 
-def generate_sql_query(table_info, client_openai):
-    """Generate SQL query using OpenAI."""
+def generate_sql_query(table_info, client_openai, previous_query=None, error=None):
+    """Generate SQL query using OpenAI, optionally fixing a previously rejected query."""
     messages = [
         {
             "role": "system",
-            "content": "You are an SQL expert. Generate a SQL query based on the table structures provided. Return only the query without any formatting."
+            "content": "You are an SQL expert. Generate a SQL query based on the table structures provided. "
+                       "Use only standard SQL that runs on both MySQL and SQLite. Return only the query without any formatting."
         },
         {
             "role": "user",
@@ -58,6 +43,9 @@ def generate_sql_query(table_info, client_openai):
             """
         }
     ]
+    if previous_query and error:
+        messages.append({"role": "assistant", "content": previous_query})
+        messages.append({"role": "user", "content": f"The query failed with: {error}\nReturn a corrected query."})
     
     return client_openai.get_completion(
         messages=messages,
@@ -65,15 +53,9 @@ def generate_sql_query(table_info, client_openai):
         temperature=0.1
     )
 
-def test_query(sql_query):
+def test_query(sql_query, db_client):
     """Test the generated SQL query."""
-    test_payload = {
-        "task": TASK_NAME,
-        "apikey": AI_DEVS_API_KEY,
-        "query": sql_query
-    }
-    
-    return requests.post(API_URL, json=test_payload).json()
+    return db_client.query(sql_query)
 
 def submit_results(dc_ids, client_aidevs):
     """Submit the final results."""
@@ -90,24 +72,40 @@ def main():
     # Initialize clients
     client_aidevs = AIDevsClient()
     client_openai = OpenAIClient()
+    db_client = DatabaseClient(API_URL)
 
-    # Step 1: Get table structures
-    table_info = get_table_info()
-    if not table_info:
-        print("Failed to get table information")
-        return
-    
-    # Step 2: Generate and test SQL query
-    sql_query = generate_sql_query(table_info, client_openai)
-    print("Generated SQL query:", sql_query)
-    
-    # Step 3: Test the query
-    test_response = test_query(sql_query)
-    print("\nQuery test response:", test_response)
+    if USE_LOCAL_MIRROR:
+        # Step 1: Copy the database locally (only on the first run or after a schema change)
+        mirror = LocalMirror(db_client, SCHEMA_CATALOG_PATH, MIRROR_PATH, ttl=SCHEMA_CATALOG_TTL)
+        if not mirror.build():
+            print("Failed to build local mirror")
+            return
+        table_info = mirror.catalog.to_prompt()
+
+        # Step 2-3: Generate the SQL query and validate it locally, retrying on errors
+        sql_query, test_response = mirror.query_with_retry(
+            lambda previous_query, error: generate_sql_query(table_info, client_openai, previous_query, error)
+        )
+        print("Generated SQL query:", sql_query)
+        print("\nQuery test response:", test_response)
+    else:
+        # Step 1: Get table structures
+        table_info = get_table_info(db_client)
+        if not table_info:
+            print("Failed to get table information")
+            return
+
+        # Step 2: Generate and test SQL query
+        sql_query = generate_sql_query(table_info, client_openai)
+        print("Generated SQL query:", sql_query)
+
+        # Step 3: Test the query
+        test_response = test_query(sql_query, db_client)
+        print("\nQuery test response:", test_response)
     
     # Step 4: Process and submit results
-    if 'reply' in test_response:
-        dc_ids = [int(row['dc_id']) for row in test_response['reply']]
+    if test_response is not None:
+        dc_ids = [int(row['dc_id']) for row in test_response]
         print("DC IDs:", dc_ids)
         
         response = submit_results(dc_ids, client_aidevs)
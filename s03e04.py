@@ -1,6 +1,11 @@
+import json
 import requests
+from utilities.bipartite_search import BipartiteSearch
+from utilities.cache import DiskCache
 from utilities.common import OpenAIClient, AIDevsClient
 from utilities.config import AI_DEVS_API_KEY, S03E04_REPORT_URL, S03E04_TASK_URL, S03E04_PEOPLE_URL, S03E04_CITIES_URL
+from utilities.polish_ner import extract_entities
+from utilities.text import normalize_key
 
 # =========================================================
 # Configuration
@@ -10,92 +15,98 @@ NOTE_URL = S03E04_TASK_URL
 PEOPLE_API = S03E04_PEOPLE_URL
 PLACES_API = S03E04_CITIES_URL
 SUBMIT_URL = S03E04_REPORT_URL
+TARGET_NAME = "BARBARA"
+MAX_ITERATIONS = 10
+CACHE_PATH = "s03e04/lookup_cache.sqlite"
+CACHE_TTL = 7 * 24 * 3600
 
 # Initialize clients
 client_openai = OpenAIClient()
 client_aidevs = AIDevsClient()
 
+# Persistent caches in front of the people and places APIs
+people_cache = DiskCache(CACHE_PATH, namespace="people", ttl=CACHE_TTL, key_func=normalize_key)
+places_cache = DiskCache(CACHE_PATH, namespace="places", ttl=CACHE_TTL, key_func=normalize_key)
+
 # =========================================================
 # Helper Functions
 # =========================================================
 def query_api(api_url, query):
-    """Query the specified API with the given query."""
+    """
+    Query the specified API with the given query.
+
+    Returns the set of names/cities from the reply, an empty set if the API
+    does not know the query (HTTP 400), or None on other errors.
+    """
     payload = {
         "apikey": AI_DEVS_API_KEY,
         "query": query
     }
     try:
         response = requests.post(api_url, json=payload)
+        if response.status_code == 400:
+            return set()
         response.raise_for_status()
-        return response.json()
+        message = response.json()['message']
     except Exception as e:
-        if response.status_code != 400:  # Only print non-400 errors
-            print(f"Error querying API {api_url} with query {query}: {e}")
+        print(f"Error querying API {api_url} with query {query}: {e}")
         return None
 
-def cities_for_names(names):
-    all_cities = set()
-    for name in names:
-        result = query_api(PEOPLE_API, name)
-        if result:
-            # Split and clean in one step
-            all_cities.update(city for city in result['message'].split() 
-                            if not (city.startswith('[') or city.startswith('http')))
-    return all_cities
-
-def names_for_cities(cities):
-    all_names = set()
-    for city in cities:
-        result = query_api(PLACES_API, city)
-        if result:
-            # Split and clean in one step
-            all_names.update(name for name in result['message'].split() 
-                           if not (name.startswith('[') or name.startswith('http')))
-    return all_names
+    # Skip restricted data markers and links
+    return {normalize_key(token) for token in message.split()
+            if not (token.startswith('[') or token.startswith('http'))}
 
-def main():
-    # =========================================================
-    # Step 1: Get and analyze note content
-    # =========================================================
-    response = requests.get(NOTE_URL)
-    note = response.text if response.status_code == 200 else None
+def cities_for_name(name):
+    return people_cache.get_or_set(name, lambda key: query_api(PEOPLE_API, normalize_key(key)))
 
-    if not note:
-        print("Failed to retrieve note")
-        return
+def names_for_city(city):
+    return places_cache.get_or_set(city, lambda key: query_api(PLACES_API, normalize_key(key)))
 
-    # Extract names and cities using OpenAI
+def classify_unknown_tokens(tokens, sentences):
+    """Ask the LLM to classify capitalized tokens the local extractor does not know or finds ambiguous."""
     messages = [
         {
             "role": "system",
             "content": (
-                "You are a named entity recognition expert. Extract two lists from the given text:\n"
-                "1. List of person names in nominative case (mianownik) without Polish characters\n"
-                "2. List of city names without Polish characters\n"
-                "Format your response exactly like this example:\n"
-                "names = ['JOHN', 'ALICE']\n"
-                "cities = ['LONDON', 'PARIS']"
+                "You are a named entity recognition expert. Classify the given Polish words into "
+                "person first names and city names, using the sentences they come from to tell their case "
+                "and meaning. Convert them to nominative case (mianownik) "
+                "without Polish characters, in upper case. Skip words that are neither.\n"
+                "Respond only with JSON like: {\"names\": [\"JOHN\"], \"cities\": [\"LONDON\"]}"
             )
         },
         {
             "role": "user",
-            "content": f"Extract names and cities from this text:\n\n{note}"
+            "content": f"Words: {', '.join(tokens)}\n\nSentences:\n" + "\n".join(sentences)
         }
     ]
-    
+
     response = client_openai.get_completion(
         messages=messages,
         model="gpt-4",
         temperature=0.1
     )
-    
-    # Create a local dictionary to store the executed variables
-    local_vars = {}
-    exec(response, globals(), local_vars)
-    
-    # Extract names and cities from the local dictionary
-    names = local_vars.get('names', [])
-    cities = local_vars.get('cities', [])
+    try:
+        return json.loads(response)
+    except (TypeError, ValueError):
+        print(f"Could not parse LLM classification: {response}")
+        return None
+
+def main():
+    # =========================================================
+    # Step 1: Get and analyze note content
+    # =========================================================
+    response = requests.get(NOTE_URL)
+    note = response.text if response.status_code == 200 else None
+
+    if not note:
+        print("Failed to retrieve note")
+        return
+
+    # Extract names and cities locally, asking the LLM only about unknown words
+    entities = extract_entities(note, fallback=classify_unknown_tokens)
+    names = entities["names"]
+    cities = entities["cities"]
     
     print("Note content:")
     print(note)
@@ -106,23 +117,22 @@ def main():
     # =========================================================
     # Step 2: Search for Barbara's location
     # =========================================================
-    found_city = ""
-    while found_city == "":
-        old_cities = set(cities)
-        
-        names = names_for_cities(cities)
-        print("Found names:", names)
-        
-        cities = cities_for_names(names)
-        
-        new_cities = set(cities) - old_cities
-        print("Difference (new cities):", new_cities)
-        
-        for city in new_cities:
-            result = query_api(PLACES_API, city)
-            if result and "BARBARA" in result['message']:
-                print("Found Barbara in:", city)
-                found_city = city
+    search = BipartiteSearch(cities_for_name, names_for_city, max_iterations=MAX_ITERATIONS)
+    initial_cities = set(cities)
+
+    def is_target_city(side, city, names_in_city):
+        # Barbara's current location is a city not mentioned in the note
+        return side == search.RIGHT and city not in initial_cities and TARGET_NAME in names_in_city
+
+    result = search.search(names, cities, is_target_city)
+    print(f"Lookup cache: {people_cache.hits + places_cache.hits} hits, "
+          f"{people_cache.misses + places_cache.misses} misses")
+    if not result:
+        print(f"{TARGET_NAME} not found")
+        return
+
+    found_city = result[1]
+    print(f"Found {TARGET_NAME} in:", found_city)
 
     # =========================================================
     # Step 3: Submit answer
@@ -1,10 +1,12 @@
-# Standard library imports
-import requests
-from collections import deque
+# Third-party imports
+import numpy as np
 
 # Local imports
 from utilities.common import AIDevsClient
 from utilities.config import AI_DEVS_API_KEY, S03E05_TASK_URL, S03E05_REPORT_URL
+from utilities.database import DatabaseClient, rows_to_columns
+from utilities.graph import CSRGraph, ShortestPathCache, load_snapshot, save_snapshot
+from utilities.mirror import LocalMirror
 
 # =========================================================
 # Configuration
@@ -13,29 +15,48 @@ TASK_NAME = "connections"
 DB_TASK_NAME = "database"
 API_URL = S03E05_TASK_URL
 SUBMIT_URL = S03E05_REPORT_URL
+# Read users and connections from a local SQLite copy instead of the remote API
+USE_LOCAL_MIRROR = False
+SCHEMA_CATALOG_PATH = "s03e05/schema_catalog.json"
+MIRROR_PATH = "s03e05/mirror.sqlite"
+# Connections are followed only from user1_id to user2_id
+DIRECTED_CONNECTIONS = True
+CONNECTION_DTYPES = {"user1_id": np.int32, "user2_id": np.int32}
+# Built graph is reused while the table row counts and DIRECTED_CONNECTIONS are unchanged
+GRAPH_SNAPSHOT_PATH = "s03e05/graph"
 
 # =========================================================
 # Data Fetching Functions
 # =========================================================
 def fetch_data(api_url, api_key):
-    """Fetch users and connections data from MySQL."""
-    users_query = {
-        "task": DB_TASK_NAME,
-        "apikey": api_key,
-        "query": "SELECT * FROM users"
-    }
-    connections_query = {
-        "task": DB_TASK_NAME,
-        "apikey": api_key,
-        "query": "SELECT * FROM connections"
+    """Fetch users and connections data from MySQL as columnar arrays."""
+    db_client = DatabaseClient(api_url, api_key, DB_TASK_NAME)
+    users = db_client.fetch_columns("users", ["id", "username"], key="id", dtypes={"id": np.int32})
+    connections = db_client.fetch_columns(
+        "connections", ["user1_id", "user2_id"], key=["user1_id", "user2_id"], dtypes=CONNECTION_DTYPES
+    )
+    if users is None or connections is None:
+        return None
+
+    return {
+        "users": users,
+        "connections": connections
     }
-    
-    users_response = requests.post(api_url, json=users_query).json()
-    connections_response = requests.post(api_url, json=connections_query).json()
-    
+
+def fetch_data_from_mirror(api_url, api_key):
+    """Fetch users and connections data from the local mirror of the database."""
+    mirror = LocalMirror(DatabaseClient(api_url, api_key, DB_TASK_NAME), SCHEMA_CATALOG_PATH, MIRROR_PATH)
+    if not mirror.build():
+        return None
+
+    users = mirror.query("SELECT id, username FROM users")
+    connections = mirror.query("SELECT user1_id, user2_id FROM connections")
+    if users is None or connections is None:
+        return None
+
     return {
-        "users": users_response["reply"],
-        "connections": connections_response["reply"]
+        "users": rows_to_columns(users, ["id", "username"], {"id": np.int32}),
+        "connections": rows_to_columns(connections, ["user1_id", "user2_id"], CONNECTION_DTYPES)
     }
 
 # =========================================================
@@ -43,47 +64,59 @@ def fetch_data(api_url, api_key):
 # =========================================================
 def build_graph(data):
     """Build user mappings and connection graph."""
-    id_to_username = {}
-    username_to_id = {}
-    
-    for user in data["users"]:
-        user_id = int(user["id"])
-        user_name = user["username"]
-        id_to_username[user_id] = user_name
-        username_to_id[user_name.lower()] = user_id
+    users = data["users"]
+    id_to_username = dict(zip(users["id"].tolist(), users["username"].tolist()))
+    username_to_id = {user_name.lower(): user_id for user_id, user_name in id_to_username.items()}
     
-    graph = {}
-    for conn in data["connections"]:
-        src = int(conn["user1_id"])
-        tgt = int(conn["user2_id"])
-        graph.setdefault(src, []).append(tgt)
+    connections = data["connections"]
+    graph = CSRGraph.from_edges(connections["user1_id"], connections["user2_id"], directed=DIRECTED_CONNECTIONS)
     
     return id_to_username, username_to_id, graph
 
-# =========================================================
-# Path Finding Functions
-# =========================================================
-def bfs_shortest_path(graph, start_id, goal_id):
-    """Find shortest path between two users using BFS."""
-    visited = set()
-    queue = deque([[start_id]])
+def load_or_build_graph(api_url, api_key):
+    """
+    Load the graph snapshot if it matches the current data, otherwise fetch and rebuild it.
 
-    while queue:
-        path = queue.popleft()
-        node = path[-1]
+    :return: Tuple (id_to_username, username_to_id, graph, path_cache) or None if fetching fails;
+             path_cache is the ShortestPathCache over the loaded graph.
+    """
+    row_counts = DatabaseClient(api_url, api_key, DB_TASK_NAME).count_rows(["users", "connections"])
+    fingerprint = {"row_counts": row_counts, "directed": DIRECTED_CONNECTIONS} if row_counts else None
+    snapshot = load_snapshot(GRAPH_SNAPSHOT_PATH, fingerprint) if fingerprint else None
+    if snapshot:
+        graph, id_to_username = snapshot
+        print("Loaded graph snapshot:", fingerprint)
+    else:
+        # Fetch data
+        if USE_LOCAL_MIRROR:
+            data = fetch_data_from_mirror(api_url, api_key)
+        else:
+            data = fetch_data(api_url, api_key)
+        if not data:
+            return None
+        print("Users:", len(data["users"]["id"]))
+        print("Connections:", len(data["connections"]["user1_id"]))
 
-        if node == goal_id:
-            return path
+        id_to_username, _, graph = build_graph(data)
+        if fingerprint:
+            save_snapshot(GRAPH_SNAPSHOT_PATH, graph, id_to_username, fingerprint)
 
-        if node not in visited:
-            visited.add(node)
-            neighbors = graph.get(node, [])
-            for neighbor in neighbors:
-                new_path = list(path)
-                new_path.append(neighbor)
-                queue.append(new_path)
+    username_to_id = {user_name.lower(): user_id for user_id, user_name in id_to_username.items()}
+    return id_to_username, username_to_id, graph, ShortestPathCache(graph)
 
-    return []
+# =========================================================
+# Path Finding Functions
+# =========================================================
+def find_paths(path_cache, username_to_id, id_to_username, pairs):
+    """Find shortest paths for many (start, target) username pairs, one BFS per distinct start."""
+    known = [(start, target) for start, target in pairs
+             if start.lower() in username_to_id and target.lower() in username_to_id]
+    paths = path_cache.paths((username_to_id[start.lower()], username_to_id[target.lower()]) for start, target in known)
+
+    results = {pair: None for pair in pairs}
+    for pair, path_ids in zip(known, paths):
+        results[pair] = [id_to_username[user_id] for user_id in path_ids]
+    return results
 
 # =========================================================
 # Main Execution
@@ -93,13 +126,12 @@ def main():
     # Initialize client
     client_aidevs = AIDevsClient()
     
-    # Fetch data
-    data = fetch_data(API_URL, AI_DEVS_API_KEY)
-    print("Users:", len(data["users"]))
-    print("Connections:", len(data["connections"]))
-    
-    # Build graph
-    id_to_username, username_to_id, graph = build_graph(data)
+    # Load or build graph
+    graph_data = load_or_build_graph(API_URL, AI_DEVS_API_KEY)
+    if not graph_data:
+        print("Failed to fetch data")
+        return
+    id_to_username, username_to_id, _, path_cache = graph_data
     
     # Find path
     start_username = "Rafał"
@@ -112,7 +144,7 @@ def main():
         print(f"No user found: {start_username} or {target_username}")
         return
     
-    path_ids = bfs_shortest_path(graph, start_id, target_id)
+    path_ids = path_cache.path(start_id, target_id)
     if not path_ids:
         print(f"No path found between {start_username} and {target_username}")
         return
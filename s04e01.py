@@ -1,10 +1,15 @@
 # Standard library imports
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Third-party imports
 import requests
-import base64
 
 # Local imports
 from utilities.common import AIDevsClient, OpenAIClient
 from utilities.config import AI_DEVS_API_KEY, S04E01_TASK_URL, S04E01_REPORT_URL
+from utilities.image_quality import triage
+from utilities.vision import VisionCache
 
 # =========================================================
 # Constants
@@ -13,10 +18,59 @@ TASK_NAME = "photos"
 API_URL = S04E01_REPORT_URL
 PHOTOS_URL = S04E01_TASK_URL
 SUBMIT_URL = S04E01_REPORT_URL
+MAX_WORKERS = 4
+MAX_STEPS_PER_PHOTO = 6
+# Decide BRIGHTEN/DARKEN/REPAIR from local image metrics when they are clear; every other
+# image still goes to the vision model with TRIAGE_PROMPT, which can answer any command
+USE_LOCAL_TRIAGE = True
+TRIAGE_PROMPT = """
+    If image is dark - return 'BRIGHTEN'
+    If bright - return 'DARKEN'
+    If damaged - return 'REPAIR'
+    Otherwise describe this person focusing on:
+    - Physical characteristics (face, hair, eyes)
+    - Clothing and style
+    - Distinctive features
+"""
+FILENAME_PATTERN = re.compile(r"[\w-]+\.(?:png|jpe?g|webp)", re.IGNORECASE)
 
 # =========================================================
 # Helper Functions
 # =========================================================
+def extract_filenames(text, instruction, exclude=None):
+    """
+    Extract image filenames from text with a regex, falling back to the LLM.
+
+    :param text: Text mentioning image filenames.
+    :param instruction: System prompt for the LLM fallback.
+    :param exclude: Optional filename to ignore (e.g. the input image echoed in a reply).
+    :return: List of filenames; the LLM is asked only if no other filename is found.
+    """
+    filenames = [
+        filename for filename in dict.fromkeys(FILENAME_PATTERN.findall(text or ""))
+        if not exclude or filename.lower() != exclude.lower()
+    ]
+    if filenames:
+        return filenames
+
+    messages = [
+        {
+            "role": "system",
+            "content": instruction
+        },
+        {
+            "role": "user",
+            "content": text
+        }
+    ]
+    result = client_openai.get_completion(
+        messages=messages,
+        model="gpt-4o",
+        temperature=0.1
+    )
+    filenames = result.split() if result else []
+    return [filename for filename in filenames if not exclude or filename.lower() != exclude.lower()]
+
 def get_info(url):
     """Get image description or status (dark/bright/damaged) from URL."""
     try:
@@ -28,34 +82,19 @@ def get_info(url):
             print("❌ Error downloading image")
             return "Error downloading image"
             
-        encoded = base64.b64encode(response.content).decode('utf-8')
-        
-        messages = [{
-            "role": "user",
-            "content": [
-                {
-                    "type": "text", 
-                    "text": """
-                        If image is dark - return 'BRIGHTEN'
-                        If bright - return 'DARKEN'
-                        If damaged - return 'REPAIR'
-                        Otherwise describe this person focusing on:
-                        - Physical characteristics (face, hair, eyes)
-                        - Clothing and style
-                        - Distinctive features
-                    """
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{encoded}"}
-                }
-            ]
-        }]
-        
-        result = client_openai.get_completion(
-            messages=messages,
+        if USE_LOCAL_TRIAGE:
+            decision, metrics = triage(response.content)
+            print(f"📊 Local triage: {decision} {metrics}")
+            if decision in ["REPAIR", "DARKEN", "BRIGHTEN"]:
+                return decision
+
+        # Quality verdicts must be recomputed after every repair, so answers are never reused
+        result = client_openai.describe_image(
+            response.content,
+            TRIAGE_PROMPT,
             model="gpt-4o",
-            temperature=0.1
+            temperature=0.1,
+            cache_mode="none"
         )
         print(f"📝 Analysis result: {result}")
         return result
@@ -83,22 +122,11 @@ def process_image_command(image_name, command=None):
             )
             print(f"📥 Response received: {response}")
 
-            messages = [
-                {
-                    "role": "system",
-                    "content": "Extract only the filename from the text."
-                },
-                {
-                    "role": "user",
-                    "content": response['message']
-                }
-            ]
-
-            next_image = client_openai.get_completion(
-                messages=messages,
-                model="gpt-4o",
-                temperature=0.1
+            # The reply may echo the input name next to the new one
+            filenames = extract_filenames(
+                response['message'], "Extract only the filename from the text.", exclude=image_name.strip("'")
             )
+            next_image = filenames[0] if filenames else None
             print(f"📸 Next image: {next_image}")
             return next_image
         else:
@@ -112,7 +140,9 @@ def process_image_until_complete(initial_image):
     """Process a single image until it's fully corrected and returns a description."""
     current_image = initial_image
     
-    while current_image:
+    for _ in range(MAX_STEPS_PER_PHOTO):
+        if not current_image:
+            return None
         image_status = get_info(current_image)
         
         if image_status in ["REPAIR", "DARKEN", "BRIGHTEN"]:
@@ -120,6 +150,7 @@ def process_image_until_complete(initial_image):
         else:
             return image_status
             
+    print(f"❌ Giving up on {initial_image} after {MAX_STEPS_PER_PHOTO} steps")
     return None
 
 def main():
@@ -130,7 +161,7 @@ def main():
     # Initialize clients
     # =========================================================
     client_aidevs = AIDevsClient()
-    client_openai = OpenAIClient()
+    client_openai = OpenAIClient(vision_cache=VisionCache())
 
     # =========================================================
     # Step 1: Start conversation and get photos
@@ -148,33 +179,20 @@ def main():
 
     message_of_photos = response['message']
 
-    messages = [
-        {
-            "role": "system",
-            "content": "Extract image names from the text, return only the filenames separated by spaces"
-        },
-        {
-            "role": "user",
-            "content": message_of_photos
-        }
-    ]
-
-    list_of_urls = client_openai.get_completion(
-        messages=messages,
-        model="gpt-4o",
-        temperature=0.1
-    ).split()
+    list_of_urls = extract_filenames(
+        message_of_photos,
+        "Extract image names from the text, return only the filenames separated by spaces"
+    )
 
     print(f"📸 Found images: {list_of_urls}")
 
     # =========================================================
-    # Step 2: Process images and generate descriptions
+    # Step 2: Process images concurrently and generate descriptions
     # =========================================================
-    descriptions = []
-    for image in list_of_urls:
-        description = process_image_until_complete(image)
-        if description:
-            descriptions.append(description)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(process_image_until_complete, list_of_urls))
+    descriptions = [description for description in results if description]
+    print(client_openai.vision_cache.report())
 
     # =========================================================
     # Step 3: Generate final description
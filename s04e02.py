@@ -2,14 +2,15 @@
 import os
 import shutil
 import zipfile
-from typing import List
+from itertools import islice
+from typing import Iterator, List, Tuple
 
 # Third-party imports
 import numpy as np
 import requests
-from sklearn.tree import DecisionTreeClassifier
 
 # Local imports
+from utilities.classifier import ClassifierEngine
 from utilities.common import AIDevsClient, OpenAIClient
 from utilities.config import AI_DEVS_API_KEY, S04E02_TASK_URL, S04E02_REPORT_URL
 
@@ -21,6 +22,11 @@ ZIP_URL = S04E02_TASK_URL
 ZIP_PATH = "s04e02/lab_data.zip"
 EXTRACT_FOLDER = "s04e02/files"
 SUBMIT_URL = S04E02_REPORT_URL
+VERIFY_CHUNK_SIZE = 100_000
+# Classifier settings: decision_tree, random_forest, gradient_boosting or knn
+ESTIMATOR = "decision_tree"
+MODEL_DIR = "models/s04e02"
+CROSS_VALIDATION_FOLDS = 5
 
 # Initialize clients
 client_aidevs = AIDevsClient()
@@ -49,50 +55,66 @@ def download_zip(url: str, path: str) -> bool:
         print(f"Error downloading ZIP: {e}")
         return False
 
-def process_verification_data() -> List[str]:
-    """Process verification data using a Decision Tree classifier.
+def load_samples(path: str) -> np.ndarray:
+    """Load comma-separated samples into a 2D int array.
     
+    Args:
+        path (str): Path to the file with one sample per line
+        
     Returns:
-        List[str]: List of valid identifiers sorted alphabetically
+        np.ndarray: Array of shape (samples, features)
     """
-    # Prepare training data
-    X_train = []  # Features
-    y_train = []  # Labels (1 for correct, 0 for incorrect)
-    
-    # Process correct samples (label 1)
-    for line in correct_content:
-        if line.strip():
-            numbers = [int(n) for n in line.strip().split(',')]
-            X_train.append(numbers)
-            y_train.append(1)
+    return np.loadtxt(path, delimiter=',', dtype=np.int64, ndmin=2)
+
+def iter_verification_chunks(path: str, chunk_size: int = VERIFY_CHUNK_SIZE) -> Iterator[Tuple[List[str], np.ndarray]]:
+    """Stream 'identifier=values' lines in chunks of parsed arrays.
     
-    # Process incorrect samples (label 0)
-    for line in incorrect_content:
-        if line.strip():
-            numbers = [int(n) for n in line.strip().split(',')]
-            X_train.append(numbers)
-            y_train.append(0)
+    Args:
+        path (str): Path to the verification file
+        chunk_size (int): Number of lines per chunk
+        
+    Yields:
+        Tuple[List[str], np.ndarray]: Identifiers and their feature rows
+    """
+    with open(path, 'r') as file:
+        while True:
+            chunk = list(islice(file, chunk_size))
+            if not chunk:
+                return
+            lines = [line for line in chunk if '=' in line]
+            if not lines:
+                continue
+            identifiers, values = zip(*(line.split('=', 1) for line in lines))
+            yield [identifier.strip() for identifier in identifiers], np.loadtxt(values, delimiter=',', dtype=np.int64, ndmin=2)
+
+def process_verification_data(data_folder: str) -> List[str]:
+    """Process verification data using the configured classifier.
     
-    # Convert to numpy arrays
-    X_train = np.array(X_train)
-    y_train = np.array(y_train)
+    Args:
+        data_folder (str): Folder with correct.txt, incorrect.txt and verify.txt
+        
+    Returns:
+        List[str]: List of valid identifiers sorted alphabetically
+    """
+    # Prepare training data (label 1 for correct, 0 for incorrect)
+    training_paths = [os.path.join(data_folder, 'correct.txt'), os.path.join(data_folder, 'incorrect.txt')]
+    correct, incorrect = (load_samples(path) for path in training_paths)
+    X_train = np.vstack([correct, incorrect])
+    y_train = np.concatenate([np.ones(len(correct), dtype=np.int8), np.zeros(len(incorrect), dtype=np.int8)])
     
-    # Train decision tree
-    clf = DecisionTreeClassifier(random_state=42)
-    clf.fit(X_train, y_train)
+    # Train the classifier, reusing the cached model when the training data is unchanged
+    clf = ClassifierEngine(ESTIMATOR, model_dir=MODEL_DIR)
+    clf.fit(X_train, y_train, fingerprint=clf.fingerprint(training_paths))
+    if CROSS_VALIDATION_FOLDS and not clf.stats["cached"]:
+        clf.cross_validate(X_train, y_train, folds=CROSS_VALIDATION_FOLDS)
     
-    # Process verification data
+    # Predict each chunk of verification rows in a single call
     valid_identifiers = []
-    for line in verify_content.split('\n'):
-        if '=' in line:
-            identifier, values = line.split('=')
-            identifier = identifier.strip()
-            numbers = [int(n) for n in values.strip().split(',')]
-            
-            # Make prediction
-            if clf.predict([numbers])[0] == 1:  # If classified as correct
-                valid_identifiers.append(identifier)
+    for identifiers, X_verify in iter_verification_chunks(os.path.join(data_folder, 'verify.txt')):
+        predictions = clf.predict(X_verify)
+        valid_identifiers.extend(identifier for identifier, label in zip(identifiers, predictions) if label == 1)
     
+    print(clf.report())
     return sorted(valid_identifiers)
 
 def main():
@@ -112,19 +134,8 @@ def main():
         with zipfile.ZipFile(ZIP_PATH, 'r') as zip_ref:
             zip_ref.extractall(EXTRACT_FOLDER)
 
-        # Read input files
-        with open(os.path.join(EXTRACT_FOLDER, 'verify.txt'), 'r') as file:
-            global verify_content
-            verify_content = file.read()
-        with open(os.path.join(EXTRACT_FOLDER, 'correct.txt'), 'r') as file:
-            global correct_content
-            correct_content = file.read().split('\n')
-        with open(os.path.join(EXTRACT_FOLDER, 'incorrect.txt'), 'r') as file:
-            global incorrect_content
-            incorrect_content = file.read().split('\n')
-
         # Process data and get valid identifiers
-        valid_ids = process_verification_data()
+        valid_ids = process_verification_data(EXTRACT_FOLDER)
         print("Valid identifiers:", valid_ids)
 
         # Submit answer
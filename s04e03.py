@@ -1,11 +1,16 @@
 # Standard library imports
+import asyncio
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 import re
+from urllib.parse import urlparse
 
 # Local imports
+from utilities.cache import DiskCache
 from utilities.common import AIDevsClient, OpenAIClient
+from utilities.condense import PageCondenser, estimate_tokens
+from utilities.crawler import Crawler, canonicalize_url, page_links, page_text, rank_links
+from utilities.link_ranker import LinkRanker, link_contexts
+from utilities.retrieval import BM25Index, tokenize
 from utilities.config import AI_DEVS_API_KEY, S04E03_TASK_URL, S04E03_REPORT_URL, S04E03_WWW_URL
 
 # =========================================================
@@ -16,9 +21,34 @@ BASE_URL = "https://softo.ag3nts.org"
 QUESTIONS_URL = S04E03_TASK_URL + AI_DEVS_API_KEY + "/softo.json"
 SUBMIT_URL = S04E03_REPORT_URL
 
+# Crawler settings
+MAX_CONNECTIONS_PER_HOST = 4
+USE_PAGE_CACHE = True  # Keep pages on disk between runs and revalidate them with ETags
+PAGE_CACHE_PATH = "s04e03/page_cache.sqlite"
+USE_ANSWER_MEMO = True  # Reuse answers from earlier runs while their source pages are unchanged
+PAGE_TOKEN_BUDGET = 1500  # Estimated tokens of page text and links per prompt
+PREFETCH_LINKS = 3  # Candidate links fetched in the background while the model decides
+MAX_MATCHING_LINES = 10  # Lines of a condensed page's full text that match the question, added to its prompt
+
+# Answering settings
+ANSWER_MODE = "index"  # "index" crawls the site once and answers from retrieved pages, "walk" follows links per question
+MAX_CRAWL_PAGES = 200
+TOP_K_PAGES = 3
+LINK_RANKER = "embeddings"  # "embeddings" follows the best-scoring link without the LLM, "llm" asks the model at every hop
+RANKER_MIN_MARGIN = 0.03  # Below this cosine similarity gap between the two best links the LLM decides
+RANKER_PAGE_THRESHOLD = 0.45  # Pages scoring at least this cosine similarity are always read by the LLM
+
 # Initialize clients
 client_aidevs = AIDevsClient()
-client_openai = OpenAIClient()
+client_openai = OpenAIClient(
+    embedding_cache=DiskCache(PAGE_CACHE_PATH, namespace="embeddings") if USE_PAGE_CACHE else None
+)
+link_ranker = LinkRanker(client_openai)
+answer_memo = DiskCache(PAGE_CACHE_PATH, namespace="answers") if USE_ANSWER_MEMO else None
+condenser = PageCondenser(
+    token_budget=PAGE_TOKEN_BUDGET,
+    cache=DiskCache(PAGE_CACHE_PATH, namespace="condensed") if USE_PAGE_CACHE else None
+)
 
 # =========================================================
 # Helper Functions
@@ -33,24 +63,15 @@ def get_questions():
         print(f"Error fetching questions: {e}")
         return None
 
-def get_page_content(url):
-    """Fetch and parse webpage content."""
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, 'html.parser')
-    except Exception as e:
-        print(f"Error fetching page {url}: {e}")
-        return None
+def analyze_page(page, question, shown_links=None, visited=None):
+    """
+    Use LLM to analyze page content and determine if it contains the answer.
 
-def analyze_page(soup, question):
-    """Use LLM to analyze page content and determine if it contains the answer."""
-    text_content = soup.get_text(strip=True)
-    links = soup.find_all('a')
-    link_texts = [
-        f"{link.get_text(strip=True)} ({urljoin(BASE_URL, link.get('href'))})"
-        for link in links if link.get('href')
-    ]
+    The page is condensed to its main content within the token budget, and links
+    already shown on earlier hops or already visited are left out.
+    """
+    text_content, links = condenser.render(page, shown_links=shown_links, visited=visited)
+    link_texts = [f"{text} ({url})" for text, url in links]
 
     system_content = (
         "You are an AI assistant helping to find answers to specific questions on webpages. "
@@ -73,14 +94,26 @@ def analyze_page(soup, question):
     )
 
     print(f"Result: {result}")
+    if not result:
+        return "NOT_FOUND"
     
     cleaned_result = re.sub(r'\[.*?\]\((.*?)\)', r'\1', result.strip())
     return cleaned_result
 
-def find_answer(question, max_depth=7):
-    """Search for answer to a question with depth limit."""
+async def find_answer(question, crawler, max_depth=7):
+    """
+    Search for answer to a question with depth limit, sharing fetched pages through the crawler.
+
+    With the embedding link ranker the walk follows the best-scoring link on its own and
+    asks the LLM only when the page may hold the answer (it scores above its links or
+    above RANKER_PAGE_THRESHOLD), when the two best links are too close to call, or on
+    the last hop, so the walk never ends without reading a page.
+
+    :return: Tuple (answer, list of source URLs) or None.
+    """
     visited = set()
-    current_url = BASE_URL
+    shown_links = set()
+    current_url = canonicalize_url(BASE_URL)
     depth = 0
     
     while depth < max_depth:
@@ -90,36 +123,212 @@ def find_answer(question, max_depth=7):
         print(f"\nVisiting: {current_url}")
         visited.add(current_url)
         
-        soup = get_page_content(current_url)
-        if not soup:
+        page = await crawler.fetch(current_url)
+        if not page:
             return None
-            
-        result = analyze_page(soup, question)
+
+        ranked = []
+        if LINK_RANKER == "embeddings":
+            candidates = [link for link in link_contexts(page) if link[1] not in visited]
+            page_score, ranked = await asyncio.to_thread(
+                link_ranker.rank, question, condenser.condensed_text(page), candidates
+            )
+            crawler.prefetch((url for _, _, url in ranked[:PREFETCH_LINKS]), host=urlparse(page["base_url"]).netloc)
+            last_hop = depth == max_depth - 1
+            if (ranked and not last_hop and page_score < min(ranked[0][0], RANKER_PAGE_THRESHOLD)
+                    and link_ranker.margin(ranked) >= RANKER_MIN_MARGIN):
+                print(f"Following best-ranked link: {ranked[0][2]} (score {ranked[0][0]:.3f})")
+                current_url = ranked[0][2]
+                depth += 1
+                continue
+        else:
+            # Fetch the likeliest next pages while the model picks a link
+            candidates = [(text, url) for text, url in page_links(page) if url not in visited]
+            crawler.prefetch(
+                (url for _, url in rank_links(question, candidates)[:PREFETCH_LINKS]), host=urlparse(page["base_url"]).netloc
+            )
+
+        result = await asyncio.to_thread(analyze_page, page, question, shown_links, visited)
         
         if result.startswith('ANSWER:'):
-            return result.replace('ANSWER:', '').strip()
+            return result.replace('ANSWER:', '').strip(), [page["url"]]
             
         if result.startswith('FOLLOW_LINK:'):
             next_url = result.replace('FOLLOW_LINK:', '').strip()
-            if next_url and next_url not in visited:
-                current_url = next_url
-                depth += 1
-                continue
-        
-        links = soup.find_all('a')
-        for link in links:
-            href = link.get('href')
-            if href:
-                next_url = urljoin(BASE_URL, href)
+            if next_url:
+                next_url = canonicalize_url(next_url, page["base_url"])
                 if next_url not in visited:
                     current_url = next_url
                     depth += 1
-                    break
+                    continue
+        
+        fallback_urls = [url for _, _, url in ranked] or [url for _, url in page_links(page)]
+        for next_url in fallback_urls:
+            if next_url not in visited:
+                current_url = next_url
+                depth += 1
+                break
         else:
             return None
         
     return None
 
+def page_document(page):
+    """
+    Render a page as indexable text: its full visible text followed by its links.
+
+    The full text keeps headers and footers (contact details, addresses) that
+    condensing drops, so they stay retrievable.
+    """
+    links = "\n".join(f"{text} ({url})" for text, url in page_links(page))
+    return f"{page_text(page)}\n\nLinks:\n{links}"
+
+def page_context(question, document, page):
+    """
+    Render a retrieved page for the answering prompt within the token budget.
+
+    Pages that fit are sent whole; longer ones are condensed, and the lines of their full
+    text sharing a term with the question are appended so that details outside the
+    main content are not lost.
+    """
+    if page is None or estimate_tokens(document) <= PAGE_TOKEN_BUDGET:
+        return document
+    text, links = condenser.render(page)
+    question_terms = set(tokenize(question))
+    matching = [
+        line for line in page_text(page).splitlines()
+        if line not in text and question_terms & set(tokenize(line))
+    ][:MAX_MATCHING_LINES]
+    link_texts = "\n".join(f"{link_text} ({url})" for link_text, url in links)
+    context = f"{text}\n\nLinks:\n{link_texts}"
+    if matching:
+        context += "\n\nOther matching lines:\n" + "\n".join(matching)
+    return context
+
+async def build_site_index(crawler):
+    """Crawl the whole site once and index every page with BM25."""
+    pages = await crawler.crawl(BASE_URL, max_pages=MAX_CRAWL_PAGES)
+    index = BM25Index()
+    for url, page in pages.items():
+        index.add(url, page_document(page))
+    print(f"Indexed {len(index)} pages")
+    return index
+
+def answer_from_index(question, index, crawler, top_k=TOP_K_PAGES):
+    """
+    Answer a question from the top-k retrieved pages in a single completion.
+
+    :return: Tuple (answer, list of retrieved page URLs) or None.
+    """
+    hits = index.search(question, k=top_k)
+    if not hits:
+        return None
+    context = "\n\n".join(
+        f"URL: {url}\n{page_context(question, index.documents[url], crawler.cached_page(url))}" for url, _ in hits
+    )
+
+    system_content = (
+        "You are an AI assistant answering questions using only the provided webpages. "
+        "Return only the answer, be very precise and concise. "
+        "If the question is about a link, return the full URL. "
+        "If the pages do not contain the answer, return 'NOT_FOUND'."
+    )
+    messages = [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": f"Question: {question}\n\nPages:\n{context}"}
+    ]
+    result = client_openai.get_completion(
+        messages=messages,
+        model="gpt-4o",
+        temperature=0.1
+    )
+
+    print(f"Result: {result}")
+    if not result or "NOT_FOUND" in result:
+        return None
+    return result.strip(), [url for url, _ in hits]
+
+async def recall_answer(question, crawler):
+    """
+    Return the memoized answer to a question if none of its source pages changed.
+
+    Source pages are revalidated through the crawler (a conditional GET when the page
+    cache is enabled) and compared by content hash.
+    """
+    memo = answer_memo.get(question, None) if answer_memo is not None else None
+    if not memo:
+        return None
+    pages = await asyncio.gather(*(crawler.fetch(url) for url, _ in memo["sources"]))
+    if all(page and page["hash"] == page_hash for page, (_, page_hash) in zip(pages, memo["sources"])):
+        return memo["answer"]
+    return None
+
+def remember_answer(memo_entries, question, answer, source_urls, crawler):
+    """
+    Prepare a memo entry with the content hashes of the answer's source pages.
+
+    Entries are only written by save_answer_memo once the submission is accepted, so a
+    rejected answer is never reused.
+    """
+    if answer_memo is None:
+        return
+    pages = [crawler.cached_page(url) for url in source_urls]
+    if all(pages):
+        memo_entries[question] = {"answer": answer, "sources": [(page["url"], page["hash"]) for page in pages]}
+
+def submission_accepted(response):
+    """Whether the central server accepted a submission (it rejects wrong answers with an error status)."""
+    return response is not None and response.get("code", 0) == 0
+
+def save_answer_memo(memo_entries):
+    """Memoize the answers of an accepted submission."""
+    if answer_memo is None:
+        return
+    for question, entry in memo_entries.items():
+        answer_memo.set(question, entry)
+
+async def answer_questions(questions):
+    """
+    Answer all questions concurrently over one shared crawler.
+
+    Memoized answers are reused while their source pages are unchanged. In index mode
+    the site is crawled once and each remaining question costs a single completion;
+    questions the retrieved pages cannot answer fall back to the link-following walk.
+
+    :return: Tuple (answers by question id, memo entries to save once the answers are accepted).
+    """
+    disk_cache = DiskCache(PAGE_CACHE_PATH, namespace="pages") if USE_PAGE_CACHE else None
+    crawler = Crawler(disk_cache=disk_cache, max_connections_per_host=MAX_CONNECTIONS_PER_HOST)
+    answers = {}
+    memo_entries = {}
+    try:
+        recalled = await asyncio.gather(*(recall_answer(question, crawler) for question in questions.values()))
+        answers.update((q_id, answer) for q_id, answer in zip(questions, recalled) if answer)
+        print(f"Reused {len(answers)} memoized answers")
+
+        remaining = {q_id: question for q_id, question in questions.items() if q_id not in answers}
+        if remaining and ANSWER_MODE == "index":
+            index = await build_site_index(crawler)
+            results = await asyncio.gather(
+                *(asyncio.to_thread(answer_from_index, question, index, crawler) for question in remaining.values())
+            )
+            for q_id, result in zip(remaining, results):
+                if result:
+                    answers[q_id] = result[0]
+                    remember_answer(memo_entries, remaining[q_id], *result, crawler)
+
+        remaining = {q_id: question for q_id, question in questions.items() if q_id not in answers}
+        if remaining:
+            results = await asyncio.gather(*(find_answer(question, crawler) for question in remaining.values()))
+            for q_id, result in zip(remaining, results):
+                if result:
+                    answers[q_id] = result[0]
+                    remember_answer(memo_entries, remaining[q_id], *result, crawler)
+    finally:
+        await crawler.close()
+    print(f"Crawler statistics: {crawler.stats}, prefetch hit rate: {crawler.prefetch_hit_rate():.0%}")
+    return {q_id: answers[q_id] for q_id in questions if q_id in answers}, memo_entries
+
 def main():
     """Main execution function."""
     # Step 1: Get questions
@@ -130,13 +339,8 @@ def main():
 
     print("Successfully fetched questions:", questions)
 
-    # Step 2: Process questions and find answers
-    answers = {}
-    for q_id, question in questions.items():
-        print(f"Processing question: {q_id}")
-        answer = find_answer(questions[q_id])
-        if answer:
-            answers[q_id] = answer
+    # Step 2: Process questions concurrently and find answers
+    answers, memo_entries = asyncio.run(answer_questions(questions))
 
     print("Found answers:", answers)
 
@@ -153,6 +357,8 @@ def main():
             submit_url=SUBMIT_URL
         )
         print(f"\nSubmission response: {response}")
+        if submission_accepted(response):
+            save_answer_memo(memo_entries)
     else:
         print("No answers found to submit")
 
@@ -0,0 +1,237 @@
+# Standard library imports
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Third-party imports
+import numpy as np
+from pydub import AudioSegment
+
+# Whisper rejects uploads over 25 MB; keep a safety margin
+MAX_UPLOAD_BYTES = 24 * 1024 * 1024
+FRAME_MS = 10
+
+
+def frame_loudness(audio, frame_ms=FRAME_MS):
+    """
+    Compute the RMS amplitude of consecutive frames of an audio segment.
+
+    :param audio: pydub AudioSegment.
+    :param frame_ms: Frame length in milliseconds.
+    :return: NumPy array with one RMS value per frame.
+    """
+    samples = np.asarray(audio.get_array_of_samples(), dtype=np.float32)
+    if audio.channels > 1:
+        samples = samples.reshape(-1, audio.channels).mean(axis=1)
+    frame = max(1, int(audio.frame_rate * frame_ms / 1000))
+    count = len(samples) // frame
+    if not count:
+        return np.zeros(1, dtype=np.float32)
+    return np.sqrt((samples[:count * frame].reshape(count, frame) ** 2).mean(axis=1))
+
+
+def find_split_points(loudness, max_chunk_ms, min_silence_ms=300, frame_ms=FRAME_MS):
+    """
+    Choose chunk boundaries at the quietest moments, keeping chunks under a maximum length.
+
+    Each boundary is placed in the second half of the allowed chunk length, at the
+    quietest stretch of `min_silence_ms` (a pause between words or sentences).
+    The last boundary is the end of the loudness frames; callers may replace it with
+    the exact duration.
+
+    :param loudness: Per-frame loudness from frame_loudness.
+    :param max_chunk_ms: Maximum chunk length in milliseconds.
+    :param min_silence_ms: Length of the quiet stretch to look for.
+    :param frame_ms: Frame length used for loudness.
+    :return: List of boundaries in milliseconds, starting with 0 and ending with the duration.
+    """
+    window = max(1, min_silence_ms // frame_ms)
+    smoothed = np.convolve(loudness, np.ones(window) / window, mode="same")
+    max_frames = max(2, max_chunk_ms // frame_ms)
+    points = [0]
+    while len(loudness) - points[-1] > max_frames:
+        low = points[-1] + max_frames // 2
+        high = points[-1] + max_frames
+        # The latest of equally quiet frames keeps chunks as long as allowed
+        points.append(high - 1 - int(np.argmin(smoothed[low:high][::-1])))
+    points.append(len(loudness))
+    return [point * frame_ms for point in points]
+
+
+def _words(text):
+    return [re.sub(r"\W", "", word).lower() for word in text.split()]
+
+
+def trim_overlap(previous, text, max_words=12):
+    """
+    Remove the words at the start of `text` that repeat the end of `previous`.
+
+    :param previous: Text already transcribed.
+    :param text: Following text, possibly transcribed from overlapping audio.
+    :param max_words: Longest overlap checked, in words.
+    :return: `text` without the repeated words.
+    """
+    previous_words, words = _words(previous), _words(text)
+    for size in range(min(max_words, len(previous_words), len(words)), 0, -1):
+        if previous_words[-size:] == words[:size] and any(words[:size]):
+            return " ".join(text.split()[size:])
+    return text
+
+
+def format_timestamp(seconds):
+    """Format seconds as HH:MM:SS."""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def format_segments(segments):
+    """Render transcript segments as '[HH:MM:SS] text' lines."""
+    return "\n".join(f"[{format_timestamp(segment['start'])}] {segment['text']}" for segment in segments)
+
+
+class AudioSegmenter:
+    """
+    Transcribes long recordings by splitting them at silences and transcribing chunks concurrently.
+
+    Chunks are bounded both in duration and in encoded size (below the upload limit),
+    extended by a short overlap on both sides so that no word is cut at a boundary, and
+    stitched back in order: every chunk keeps only the segments centered in its own
+    time range, and words repeated across the junction are dropped. Small files are
+    uploaded whole, without decoding. Uploads of all files share one bounded pool.
+    """
+
+    def __init__(self, client_openai, max_chunk_seconds=120, overlap_seconds=1.5, min_silence_ms=300,
+                 max_chunk_bytes=MAX_UPLOAD_BYTES, export_format="mp3", bitrate="64k", max_workers=4,
+                 whole_file_bytes=None):
+        """
+        Initialize the AudioSegmenter.
+
+        :param client_openai: OpenAIClient used for transcription.
+        :param max_chunk_seconds: Maximum chunk duration (shorter chunks mean more parallelism).
+        :param overlap_seconds: Audio shared by neighbouring chunks.
+        :param min_silence_ms: Length of the pause searched for at chunk boundaries.
+        :param max_chunk_bytes: Maximum encoded chunk size.
+        :param export_format: Format chunks are encoded in before upload.
+        :param bitrate: Encoding bitrate, used to bound the chunk size.
+        :param max_workers: Number of concurrent decoding jobs and transcription requests.
+        :param whole_file_bytes: Files up to this size are uploaded as they are; defaults to
+                                 the size of one chunk at `bitrate`.
+        """
+        self.client_openai = client_openai
+        bytes_per_second = int(bitrate.rstrip("k")) * 1000 / 8
+        self.max_chunk_ms = int(min(max_chunk_seconds, 0.9 * max_chunk_bytes / bytes_per_second) * 1000)
+        self.overlap_ms = int(overlap_seconds * 1000)
+        self.min_silence_ms = min_silence_ms
+        self.export_format = export_format
+        self.bitrate = bitrate
+        self.max_workers = max_workers
+        if whole_file_bytes is None:
+            whole_file_bytes = int(self.max_chunk_ms / 1000 * bytes_per_second)
+        self.whole_file_bytes = min(whole_file_bytes, max_chunk_bytes)
+
+    def split(self, audio):
+        """
+        Split audio into overlapping chunks.
+
+        :param audio: pydub AudioSegment.
+        :return: List of (offset_ms, owned_start_ms, owned_end_ms, chunk) tuples, where
+                 chunk starts at offset_ms and [owned_start_ms, owned_end_ms) is the part
+                 of the recording the chunk is responsible for.
+        """
+        points = find_split_points(frame_loudness(audio), self.max_chunk_ms, self.min_silence_ms)
+        points[-1] = len(audio)
+        chunks = []
+        for start, end in zip(points, points[1:]):
+            offset = max(0, start - self.overlap_ms)
+            chunks.append((offset, start, end, audio[offset:min(len(audio), end + self.overlap_ms)]))
+        return chunks
+
+    def _prepare(self, audio_path, directory, file_index):
+        """
+        Turn a recording into upload jobs.
+
+        :return: List of (offset_ms, owned_start_ms, owned_end_ms, path) tuples (owned_end_ms
+                 is None for the last chunk), or None if the file cannot be decoded.
+        """
+        try:
+            if os.path.getsize(audio_path) <= self.whole_file_bytes:
+                return [(0, 0, None, audio_path)]
+            audio = AudioSegment.from_file(audio_path)
+            jobs = []
+            for index, (offset, owned_start, owned_end, chunk) in enumerate(self.split(audio)):
+                path = os.path.join(directory, f"file_{file_index:04d}_chunk_{index:04d}.{self.export_format}")
+                chunk.export(path, format=self.export_format, bitrate=self.bitrate)
+                jobs.append((offset, owned_start, None if owned_end == len(audio) else owned_end, path))
+            return jobs
+        except Exception as e:
+            # Undecodable files and a missing ffmpeg only fail this recording
+            print(f"Error preparing {audio_path} for transcription: {e}")
+            return None
+
+    def _transcribe_chunk(self, path):
+        response = self.client_openai.transcribe(path, response_format="verbose_json")
+        if response is None:
+            return None
+        return response.get("segments") or [
+            {"start": 0.0, "end": float(response.get("duration") or 0.0), "text": response.get("text", "")}
+        ]
+
+    @staticmethod
+    def _stitch(jobs, results):
+        segments = []
+        for (offset, owned_start, owned_end, _), chunk_segments in zip(jobs, results):
+            for segment in chunk_segments:
+                start = offset / 1000 + segment["start"]
+                end = offset / 1000 + segment["end"]
+                middle = (start + end) * 500
+                if middle < owned_start or (owned_end is not None and middle >= owned_end):
+                    continue
+                text = segment["text"].strip()
+                if segments:
+                    text = trim_overlap(segments[-1]["text"], text)
+                if text:
+                    segments.append({"start": start, "end": end, "text": text})
+        return {"text": " ".join(segment["text"] for segment in segments), "segments": segments}
+
+    def transcribe_many(self, audio_paths):
+        """
+        Transcribe several recordings of any length through one pool of `max_workers` threads.
+
+        All files are decoded and split first, then every chunk of every file is uploaded
+        from the same pool, so at most `max_workers` requests run at once.
+
+        :param audio_paths: Paths to the audio files.
+        :return: Dictionary mapping each path to a dictionary with 'text' and timestamped
+                 'segments' (start/end in seconds from the beginning of the recording), or
+                 to None if the file could not be decoded or any chunk failed.
+        """
+        audio_paths = list(audio_paths)
+        with tempfile.TemporaryDirectory() as directory, ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            prepared = list(executor.map(
+                lambda item: self._prepare(item[1], directory, item[0]), enumerate(audio_paths)
+            ))
+            futures = [
+                [executor.submit(self._transcribe_chunk, job[3]) for job in jobs] if jobs else None
+                for jobs in prepared
+            ]
+            results = [[future.result() for future in chunk_futures] if chunk_futures else None
+                       for chunk_futures in futures]
+
+        transcripts = {}
+        for audio_path, jobs, chunk_results in zip(audio_paths, prepared, results):
+            if chunk_results is None or any(result is None for result in chunk_results):
+                transcripts[audio_path] = None
+            else:
+                transcripts[audio_path] = self._stitch(jobs, chunk_results)
+        return transcripts
+
+    def transcribe(self, audio_path):
+        """
+        Transcribe a recording of any length.
+
+        :param audio_path: Path to the audio file.
+        :return: Dictionary with 'text' and timestamped 'segments' (start/end in seconds
+                 from the beginning of the recording), or None if it failed.
+        """
+        return self.transcribe_many([audio_path])[audio_path]
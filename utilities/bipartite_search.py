@@ -0,0 +1,99 @@
+# Standard library imports
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BipartiteSearch:
+    """
+    Breadth-first search over a bipartite graph whose edges are discovered through lookups
+    (e.g. people -> places and places -> people).
+
+    Lookups are memoized, including empty (negative) results, only the newly discovered
+    frontier is expanded on each iteration, and all frontier lookups of an iteration run
+    concurrently.
+    """
+
+    LEFT = "left"
+    RIGHT = "right"
+
+    def __init__(self, lookup_left, lookup_right, max_workers=8, max_iterations=20, max_visited=10000):
+        """
+        Initialize the BipartiteSearch.
+
+        :param lookup_left: Callable mapping a left node to a set of right nodes,
+                            an empty set if unknown, or None on a transient error.
+        :param lookup_right: Callable mapping a right node to a set of left nodes (same contract).
+        :param max_workers: Maximum number of concurrent lookups.
+        :param max_iterations: Maximum number of BFS levels.
+        :param max_visited: Maximum number of visited nodes on both sides combined.
+        """
+        self.lookups = {self.LEFT: lookup_left, self.RIGHT: lookup_right}
+        self.memo = {self.LEFT: {}, self.RIGHT: {}}
+        self.max_workers = max_workers
+        self.max_iterations = max_iterations
+        self.max_visited = max_visited
+
+    def lookup(self, side, node):
+        """
+        Look up the neighbors of a node, using the memo when possible.
+
+        :return: Set of neighbor nodes (possibly empty) or None on a transient error.
+        """
+        if node in self.memo[side]:
+            return self.memo[side][node]
+        neighbors = self.lookups[side](node)
+        if neighbors is not None:
+            self.memo[side][node] = set(neighbors)
+        return neighbors
+
+    def expand(self, frontier):
+        """
+        Look up all frontier nodes concurrently.
+
+        :param frontier: Dictionary mapping side to a set of nodes.
+        :return: List of (side, node, neighbors) tuples.
+        """
+        tasks = [(side, node) for side, nodes in frontier.items() for node in sorted(nodes)]
+        if not tasks:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+            results = executor.map(lambda task: self.lookup(*task), tasks)
+            return [(side, node, neighbors) for (side, node), neighbors in zip(tasks, results)]
+
+    def search(self, start_left, start_right, is_goal):
+        """
+        Expand the graph level by level until a goal node is found.
+
+        :param start_left: Initial left nodes.
+        :param start_right: Initial right nodes.
+        :param is_goal: Callable taking (side, node, neighbors) and returning True for the goal.
+        :return: Tuple (side, node) of the goal, or None if not found within the bounds.
+        """
+        visited = {self.LEFT: set(start_left), self.RIGHT: set(start_right)}
+        frontier = {self.LEFT: set(start_left), self.RIGHT: set(start_right)}
+
+        for iteration in range(1, self.max_iterations + 1):
+            if not frontier[self.LEFT] and not frontier[self.RIGHT]:
+                print("Search space exhausted")
+                return None
+
+            discovered = {self.LEFT: set(), self.RIGHT: set()}
+            for side, node, neighbors in self.expand(frontier):
+                if not neighbors:
+                    continue
+                if is_goal(side, node, neighbors):
+                    return side, node
+                other = self.RIGHT if side == self.LEFT else self.LEFT
+                discovered[other].update(neighbors - visited[other])
+
+            for side in (self.LEFT, self.RIGHT):
+                visited[side].update(discovered[side])
+            frontier = discovered
+            print(f"Iteration {iteration}: new {self.LEFT} {sorted(discovered[self.LEFT])}, "
+                  f"new {self.RIGHT} {sorted(discovered[self.RIGHT])}")
+
+            if len(visited[self.LEFT]) + len(visited[self.RIGHT]) > self.max_visited:
+                print(f"Visited node limit ({self.max_visited}) reached")
+                return None
+
+        print(f"Iteration limit ({self.max_iterations}) reached")
+        return None
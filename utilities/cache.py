@@ -0,0 +1,111 @@
+# Standard library imports
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+# Returned by DiskCache.get when a key is absent or expired
+MISSING = object()
+
+
+class DiskCache:
+    """
+    A persistent key/value cache stored in SQLite.
+
+    Values are pickled, entries expire after a TTL, and negative results (e.g. "not
+    found" replies) are recorded too, optionally with their own TTL. The cache is safe
+    to share between threads.
+    """
+
+    def __init__(self, path, namespace="default", ttl=None, negative_ttl=None, key_func=None):
+        """
+        Initialize the DiskCache.
+
+        :param path: Path of the SQLite file.
+        :param namespace: Namespace separating caches that share a file.
+        :param ttl: Seconds after which entries expire (None means never).
+        :param negative_ttl: Seconds after which negative entries expire (defaults to ttl).
+        :param key_func: Optional callable normalizing keys before they are stored or looked up.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl if negative_ttl is not None else ttl
+        self.key_func = key_func or (lambda key: key)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT, key TEXT, value BLOB, negative INTEGER, created_at REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+
+    def get(self, key, default=MISSING):
+        """
+        Get a cached value.
+
+        :param key: Cache key.
+        :param default: Value returned when the key is absent or expired.
+        :return: Cached value or default.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, negative, created_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, self.key_func(key))
+            ).fetchone()
+            fresh = False
+            if row is not None:
+                ttl = self.negative_ttl if row[1] else self.ttl
+                fresh = ttl is None or time.time() - row[2] < ttl
+            # Counters are shared by all threads using the cache
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return pickle.loads(row[0]) if fresh else default
+
+    def set(self, key, value, negative=False):
+        """
+        Store a value.
+
+        :param key: Cache key.
+        :param value: Picklable value.
+        :param negative: Whether the value is a negative result (uses negative_ttl).
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, negative, created_at) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, self.key_func(key), pickle.dumps(value), int(negative), time.time())
+            )
+
+    def get_or_set(self, key, compute, is_negative=lambda value: not value):
+        """
+        Return the cached value for a key, computing and storing it on a miss.
+
+        :param key: Cache key.
+        :param compute: Callable taking the key and returning the value; None is treated
+                        as a transient failure and is not cached.
+        :param is_negative: Callable deciding whether a computed value is a negative result.
+        :return: Cached or computed value.
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        value = compute(key)
+        if value is not None:
+            self.set(key, value, negative=is_negative(value))
+        return value
+
+    def delete(self, key):
+        """Remove a key from the cache."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, self.key_func(key))
+            )
@@ -0,0 +1,133 @@
+# Standard library imports
+import hashlib
+import os
+import time
+
+# Third-party imports
+import joblib
+import sklearn
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.model_selection import cross_val_score
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+# Estimator factories selectable by name; keyword arguments override the defaults
+ESTIMATORS = {
+    "decision_tree": lambda **params: DecisionTreeClassifier(**{"random_state": 42, **params}),
+    "random_forest": lambda **params: RandomForestClassifier(**{"n_estimators": 200, "n_jobs": -1, "random_state": 42, **params}),
+    "gradient_boosting": lambda **params: GradientBoostingClassifier(**{"random_state": 42, **params}),
+    "knn": lambda **params: KNeighborsClassifier(**{"n_neighbors": 5, **params}),
+}
+
+
+def fingerprint_files(paths, *extra):
+    """
+    Compute a fingerprint of file contents plus extra identifying values.
+
+    :param paths: Paths of the files to hash.
+    :param extra: Additional values (e.g. estimator name and parameters) to include.
+    :return: Hex digest.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    for value in extra:
+        digest.update(repr(value).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ClassifierEngine:
+    """
+    Trains, caches and applies a pluggable scikit-learn classifier.
+
+    Fitted models are stored with joblib under a fingerprint of the training data and
+    estimator settings, so unchanged data reuses the model from disk.
+    """
+
+    def __init__(self, estimator="decision_tree", model_dir="models", **params):
+        """
+        Initialize the ClassifierEngine.
+
+        :param estimator: Name of an estimator in ESTIMATORS.
+        :param model_dir: Directory holding cached models.
+        :param params: Keyword arguments passed to the estimator.
+        """
+        if estimator not in ESTIMATORS:
+            raise ValueError(f"Unknown estimator '{estimator}', choose one of: {', '.join(ESTIMATORS)}")
+        self.estimator_name = estimator
+        self.params = params
+        self.model_dir = model_dir
+        self.model = None
+        self.stats = {}
+
+    def _model_path(self, fingerprint):
+        return os.path.join(self.model_dir, f"{self.estimator_name}-{fingerprint[:16]}.joblib")
+
+    def fingerprint(self, training_paths):
+        """Fingerprint training files together with the estimator settings and sklearn version."""
+        return fingerprint_files(training_paths, self.estimator_name, sorted(self.params.items()), sklearn.__version__)
+
+    def fit(self, X, y, fingerprint=None):
+        """
+        Fit the estimator, or load a cached model fitted on the same data.
+
+        :param X: Training features.
+        :param y: Training labels.
+        :param fingerprint: Fingerprint of the training data; without it nothing is cached.
+        :return: self
+        """
+        path = self._model_path(fingerprint) if fingerprint else None
+        if path and os.path.exists(path):
+            self.model = joblib.load(path)
+            self.stats["cached"] = True
+            return self
+
+        self.model = ESTIMATORS[self.estimator_name](**self.params)
+        started = time.perf_counter()
+        self.model.fit(X, y)
+        elapsed = time.perf_counter() - started
+        self.stats.update({"cached": False, "fit_seconds": elapsed, "fit_rows_per_second": len(X) / max(elapsed, 1e-9)})
+
+        if path:
+            os.makedirs(self.model_dir, exist_ok=True)
+            joblib.dump(self.model, path)
+        return self
+
+    def predict(self, X):
+        """Predict labels and accumulate prediction throughput statistics."""
+        started = time.perf_counter()
+        predictions = self.model.predict(X)
+        self.stats["predict_rows"] = self.stats.get("predict_rows", 0) + len(X)
+        self.stats["predict_seconds"] = self.stats.get("predict_seconds", 0.0) + time.perf_counter() - started
+        return predictions
+
+    def cross_validate(self, X, y, folds=5, n_jobs=-1):
+        """
+        Score a fresh estimator with k-fold cross-validation, running folds in parallel.
+
+        :param X: Features.
+        :param y: Labels.
+        :param folds: Number of folds.
+        :param n_jobs: Number of parallel jobs (-1 uses all cores).
+        :return: Array of fold accuracies.
+        """
+        scores = cross_val_score(ESTIMATORS[self.estimator_name](**self.params), X, y, cv=folds, n_jobs=n_jobs)
+        self.stats["cv_mean"] = float(scores.mean())
+        self.stats["cv_std"] = float(scores.std())
+        return scores
+
+    def report(self):
+        """Return a one-line summary of training, validation and prediction statistics."""
+        parts = [self.estimator_name]
+        if self.stats.get("cached"):
+            parts.append("model loaded from cache")
+        elif "fit_seconds" in self.stats:
+            parts.append(f"fit {self.stats['fit_seconds']:.3f}s ({self.stats['fit_rows_per_second']:,.0f} rows/s)")
+        if "cv_mean" in self.stats:
+            parts.append(f"cv accuracy {self.stats['cv_mean']:.3f} ± {self.stats['cv_std']:.3f}")
+        if self.stats.get("predict_rows"):
+            rate = self.stats["predict_rows"] / max(self.stats["predict_seconds"], 1e-9)
+            parts.append(f"predict {self.stats['predict_rows']:,} rows ({rate:,.0f} rows/s)")
+        return ", ".join(parts)
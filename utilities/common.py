@@ -1,4 +1,6 @@
 # Standard library imports
+import base64
+import hashlib
 import requests
 
 # Third-party imports
@@ -14,13 +16,19 @@ class OpenAIClient:
     A client to interact with OpenAI's APIs, including Chat Completion and Whisper transcription.
     """
 
-    def __init__(self, model="gpt-4"):
+    def __init__(self, model="gpt-4", vision_cache=None, embedding_cache=None):
         """
         Initialize the OpenAI client using the API key.
+
+        :param model: Default model for Chat Completion.
+        :param vision_cache: Optional VisionCache reusing answers for near-duplicate images.
+        :param embedding_cache: Optional DiskCache of embeddings used by create_embeddings_batch.
         """
         self.api_key = OPEN_AI_API_KEY
         self.model = model  # Default model for Chat Completion
         self.headers = {"Authorization": f"Bearer {self.api_key}"}
+        self.vision_cache = vision_cache
+        self.embedding_cache = embedding_cache
 
     def get_completion(self, messages, model=None, max_tokens=1500, temperature=0.2):
         """
@@ -51,20 +59,54 @@ class OpenAIClient:
             print(f"An error occurred: {e}")
             return None
 
-    def transcribe(self, audio_file):
+    def describe_image(self, image_bytes, prompt, model=None, mime_type="image/png", max_tokens=1500, temperature=0.1,
+                       cache_mode="exact"):
+        """
+        Ask a vision model about an image, reusing answers for repeated images if a vision cache is set.
+
+        :param image_bytes: Encoded image.
+        :param prompt: Text sent along with the image.
+        :param model: The model to use (defaults to self.model if not specified).
+        :param mime_type: MIME type used in the data URL.
+        :param max_tokens: Maximum tokens for the response.
+        :param temperature: The sampling temperature for the model.
+        :param cache_mode: VisionCache mode: 'exact' (identical bytes only), 'near' (also
+                           re-encoded copies, for free-form descriptions) or 'none'.
+        :return: The model's response or None if an error occurs.
+        """
+        def request():
+            encoded = base64.b64encode(image_bytes).decode('utf-8')
+            messages = [{
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{encoded}"}}
+                ]
+            }]
+            return self.get_completion(messages, model=model, max_tokens=max_tokens, temperature=temperature)
+
+        if self.vision_cache is None:
+            return request()
+        return self.vision_cache.get_or_compute(image_bytes, prompt, request, mode=cache_mode)
+
+    def transcribe(self, audio_file, response_format=None):
         """
         Transcribes an audio file using OpenAI's Whisper API.
 
         :param audio_file: Path to the audio file to transcribe.
+        :param response_format: Optional Whisper response format, e.g. 'verbose_json' for segment timestamps.
         :return: Transcription result as a dictionary.
         """
+        data = {"model": "whisper-1"}
+        if response_format:
+            data["response_format"] = response_format
         try:
             with open(audio_file, "rb") as audio:
                 response = requests.post(
                     "https://api.openai.com/v1/audio/transcriptions",
                     headers=self.headers,
                     files={"file": audio},
-                    data={"model": "whisper-1"}
+                    data=data
                 )
                 response.raise_for_status()
                 return response.json()  # Returns the full transcription response
@@ -118,6 +160,53 @@ class OpenAIClient:
             print(f"An error occurred during embedding creation: {e}")
             return None 
 
+    def create_embeddings_batch(self, texts, model="text-embedding-3-small", batch_size=256):
+        """
+        Create embeddings for many texts with as few requests as possible.
+
+        Texts found in the embedding cache are not sent again, duplicates are sent once,
+        and the rest are sent in batches of up to `batch_size` inputs.
+
+        :param texts: List of non-empty texts.
+        :param model: Model to use for embeddings.
+        :param batch_size: Maximum number of inputs per request.
+        :return: List of embeddings aligned with texts (None for texts that failed).
+        """
+        keys = [hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest() for text in texts]
+        embeddings = {}
+        pending = {}  # key -> text still to embed
+        for key, text in zip(keys, texts):
+            if key in embeddings or key in pending:
+                continue
+            cached = self.embedding_cache.get(key, None) if self.embedding_cache is not None else None
+            if cached is not None:
+                embeddings[key] = cached
+            else:
+                pending[key] = text
+
+        pending_keys = list(pending)
+        for start in range(0, len(pending_keys), batch_size):
+            batch = pending_keys[start:start + batch_size]
+            try:
+                response = requests.post(
+                    "https://api.openai.com/v1/embeddings",
+                    headers=self.headers,
+                    json={
+                        "model": model,
+                        "input": [pending[key] for key in batch]
+                    }
+                )
+                response.raise_for_status()
+                for item in response.json()["data"]:
+                    key = batch[item["index"]]
+                    embeddings[key] = item["embedding"]
+                    if self.embedding_cache is not None:
+                        self.embedding_cache.set(key, item["embedding"])
+            except Exception as e:
+                print(f"An error occurred during embedding creation: {e}")
+
+        return [embeddings.get(key) for key in keys]
+
 
 class AIDevsClient:
     """
@@ -0,0 +1,184 @@
+# Standard library imports
+import re
+import threading
+
+# Third-party imports
+from bs4 import BeautifulSoup
+
+# Local imports
+from utilities.crawler import element_text, page_links
+
+# Rough size of a token for budgeting prompts without a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Elements that never hold main content
+BOILERPLATE_TAGS = {"nav", "header", "footer", "aside", "form", "script", "style", "noscript", "template", "iframe"}
+_BOILERPLATE_ATTR_RE = re.compile(r"nav|menu|footer|sidebar|cookie|banner|breadcrumb|social|share|advert|promo", re.I)
+
+# Elements whose text is scored as content
+_CONTENT_TAGS = ["p", "pre", "td", "li", "blockquote", "dd", "h1", "h2", "h3", "h4", "h5", "h6"]
+_MIN_BLOCK_LENGTH = 25
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in a text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Cut a text to roughly `max_tokens` tokens, preferring a line boundary.
+
+    :param text: Text to cut.
+    :param max_tokens: Token budget.
+    :return: Text within the budget.
+    """
+    limit = max(max_tokens, 0) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut if cut > limit // 2 else limit].rstrip() + "\n[...]"
+
+
+def link_density(element):
+    """Share of an element's text that sits inside links."""
+    text_length = len(element.get_text(" ", strip=True))
+    if not text_length:
+        return 0.0
+    link_length = sum(len(link.get_text(" ", strip=True)) for link in element.find_all("a"))
+    return min(link_length / text_length, 1.0)
+
+
+def strip_boilerplate(html):
+    """
+    Parse a page and remove navigation, headers, footers, forms and link lists.
+
+    :param html: Page HTML.
+    :return: New BeautifulSoup document without boilerplate.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for element in soup.find_all(True):
+        if element.decomposed or element.name in ("html", "body", "main", "article"):
+            continue
+        attributes = " ".join(element.get("class", [])) + " " + (element.get("id") or "")
+        if element.name in BOILERPLATE_TAGS or _BOILERPLATE_ATTR_RE.search(attributes):
+            element.decompose()
+        elif element.name in ("ul", "ol", "div") and element.find("a") and link_density(element) > 0.8:
+            element.decompose()
+    return soup
+
+
+def main_content(soup):
+    """
+    Find the elements holding the main content, readability style.
+
+    Paragraph-like blocks score their parent (fully) and grandparent (half) by length
+    and comma count; scores are discounted by link density. The best container is
+    returned together with siblings scoring at least a fifth of it.
+
+    :param soup: Document, ideally after strip_boilerplate.
+    :return: List of elements in document order (empty when nothing scores).
+    """
+    candidates = {}  # id(element) -> [element, score]
+    for block in soup.find_all(_CONTENT_TAGS):
+        text = block.get_text(" ", strip=True)
+        if len(text) < _MIN_BLOCK_LENGTH:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = block.parent
+        for share in (1.0, 0.5):
+            if parent is None or parent.name == "[document]":
+                break
+            candidates.setdefault(id(parent), [parent, 0.0])[1] += score * share
+            parent = parent.parent
+
+    if not candidates:
+        return []
+    for candidate in candidates.values():
+        candidate[1] *= 1 - link_density(candidate[0])
+    best, best_score = max(candidates.values(), key=lambda candidate: candidate[1])
+    if best.parent is None:
+        return [best]
+
+    threshold = max(best_score * 0.2, 1.0)
+    selected = []
+    for sibling in best.parent.find_all(True, recursive=False):
+        entry = candidates.get(id(sibling))
+        if sibling is best or (entry and entry[1] >= threshold):
+            selected.append(sibling)
+        elif sibling.name == "p" and len(sibling.get_text(strip=True)) > 80 and link_density(sibling) < 0.25:
+            selected.append(sibling)
+    return selected
+
+
+class PageCondenser:
+    """
+    Turns pages into compact, token-bounded prompt text.
+
+    The boilerplate-free text of a page is kept whole when it fits the budget, and
+    reduced to its main content otherwise. Condensed text is cached by page content
+    hash (in memory and optionally in a DiskCache), so a page shared by several
+    questions or crawler runs is only condensed once. Links are filtered per caller,
+    dropping ones already shown or visited.
+    """
+
+    def __init__(self, token_budget=1500, cache=None):
+        """
+        Initialize the PageCondenser.
+
+        :param token_budget: Maximum estimated tokens of a rendered page.
+        :param cache: Optional DiskCache of condensed text keyed by page hash.
+        """
+        self.token_budget = token_budget
+        self.cache = cache
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _condense(self, html):
+        soup = strip_boilerplate(html)
+        text = element_text(soup)
+        if estimate_tokens(text) > self.token_budget:
+            main_text = "\n".join(element_text(element) for element in main_content(soup))
+            text = main_text or text
+        return text
+
+    def condensed_text(self, page):
+        """
+        Return the condensed text of a page, computing it at most once per page hash.
+
+        :param page: Page dictionary returned by Crawler.fetch.
+        :return: Main text of the page (not yet truncated to the budget).
+        """
+        with self._lock:
+            if page["hash"] in self._memory:
+                return self._memory[page["hash"]]
+        if self.cache is not None:
+            text = self.cache.get_or_set(page["hash"], lambda _: self._condense(page["html"]), is_negative=lambda _: False)
+        else:
+            text = self._condense(page["html"])
+        with self._lock:
+            self._memory[page["hash"]] = text
+        return text
+
+    def render(self, page, shown_links=None, visited=None):
+        """
+        Render a page for a prompt within the token budget.
+
+        :param page: Page dictionary returned by Crawler.fetch.
+        :param shown_links: URLs already shown to the model; updated with the links rendered now.
+        :param visited: URLs already visited, never rendered.
+        :return: Tuple (text, links) where links is the list of (anchor text, URL) rendered.
+        """
+        skip = set(shown_links or ()) | set(visited or ())
+        links, link_tokens = [], 0
+        for text, url in page_links(page):
+            if url in skip:
+                continue
+            cost = estimate_tokens(f"{text} ({url})")
+            if link_tokens + cost > self.token_budget // 3:
+                break
+            links.append((text, url))
+            link_tokens += cost
+        if shown_links is not None:
+            shown_links.update(url for _, url in links)
+        return truncate_to_tokens(self.condensed_text(page), self.token_budget - link_tokens), links
@@ -0,0 +1,273 @@
+# Standard library imports
+import asyncio
+import hashlib
+from urllib.parse import urldefrag, urljoin, urlparse, urlunparse
+
+# Third-party imports
+import requests
+from bs4 import BeautifulSoup, NavigableString
+from requests.adapters import HTTPAdapter
+
+# Local imports
+from utilities.retrieval import tokenize
+
+# Elements whose text is never page content
+NON_TEXT_TAGS = {"script", "style", "noscript", "template", "head", "title", "meta"}
+
+# Links to these files are not crawled
+BINARY_EXTENSIONS = (".pdf", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".mp3", ".mp4", ".zip", ".css", ".js")
+
+
+def canonicalize_url(url, base_url=None):
+    """
+    Normalize a URL so that equivalent links map to the same cache key.
+
+    Resolves relative links, drops fragments and default ports, lower-cases the scheme
+    and host, and uses '/' for an empty path. Trailing slashes are kept because they
+    change how relative links on the page resolve.
+
+    :param url: URL or relative link.
+    :param base_url: URL the link was found on.
+    :return: Canonical absolute URL.
+    """
+    if base_url:
+        url = urljoin(base_url, url)
+    url, _ = urldefrag(url)
+    parts = urlparse(url)
+    host = parts.hostname or ""
+    if parts.port and (parts.scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    return urlunparse((parts.scheme.lower(), host.lower(), path, "", parts.query, ""))
+
+
+def is_crawlable(url, host=None):
+    """
+    Whether a link should be fetched: not a binary file and, if `host` is given, on that host.
+
+    :param url: Canonical absolute URL.
+    :param host: Optional host (netloc) the URL must be on.
+    :return: True if the URL is worth fetching.
+    """
+    parts = urlparse(url)
+    return not parts.path.lower().endswith(BINARY_EXTENSIONS) and (host is None or parts.netloc == host)
+
+
+def page_links(page):
+    """
+    List the links on a page.
+
+    :param page: Page dictionary returned by Crawler.fetch.
+    :return: List of (anchor text, canonical URL) tuples in document order, without duplicates.
+    """
+    links, seen = [], set()
+    for link in page["soup"].find_all("a"):
+        href = link.get("href")
+        if not href or href.startswith(("mailto:", "tel:", "javascript:")):
+            continue
+        url = canonicalize_url(href, page["base_url"])
+        if url not in seen:
+            seen.add(url)
+            links.append((link.get_text(" ", strip=True), url))
+    return links
+
+
+def rank_links(query, links):
+    """
+    Rank links by term overlap of their anchor text and URL path with a query.
+
+    :param query: Text the links should be relevant to (e.g. a question).
+    :param links: List of (anchor text, URL) tuples.
+    :return: List of (score, anchor text, URL) tuples, best first; ties keep document order.
+    """
+    query_terms = set(tokenize(query))
+    scored = [
+        (len(query_terms & set(tokenize(f"{text} {urlparse(url).path}"))), text, url)
+        for text, url in links
+    ]
+    return sorted(scored, key=lambda item: -item[0])
+
+
+def element_text(element):
+    """
+    Extract the visible text of an element, one line per text node.
+
+    :param element: BeautifulSoup document or tag.
+    :return: Text without scripts, styles and comments.
+    """
+    lines = (
+        string.strip() for string in element.find_all(string=True)
+        if type(string) is NavigableString and string.parent.name not in NON_TEXT_TAGS
+    )
+    return "\n".join(line for line in lines if line)
+
+
+def page_text(page):
+    """Extract the visible text of a page returned by Crawler.fetch."""
+    return element_text(page["soup"])
+
+
+class Crawler:
+    """
+    An asyncio web crawler with per-host connection pools and a shared page cache.
+
+    Requests run in worker threads on pooled `requests` sessions, limited per host by a
+    semaphore. Every URL is downloaded and parsed at most once per run; concurrent
+    fetches of the same URL share one download. An optional DiskCache keeps pages
+    across runs and revalidates them with ETag / Last-Modified conditional requests.
+    """
+
+    def __init__(self, disk_cache=None, max_connections_per_host=4, timeout=30):
+        """
+        Initialize the Crawler.
+
+        :param disk_cache: Optional DiskCache for pages across runs.
+        :param max_connections_per_host: Maximum concurrent requests per host.
+        :param timeout: Request timeout in seconds.
+        """
+        self.disk_cache = disk_cache
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.pages = {}  # canonical URL -> task resolving to a page dictionary or None
+        self.stats = {"downloaded": 0, "revalidated": 0, "memory_hits": 0, "prefetched": 0, "prefetch_hits": 0}
+        self._prefetched = set()  # URLs fetched speculatively and not yet requested
+        self._sessions = {}
+        self._semaphores = {}
+
+    def _session(self, host):
+        if host not in self._sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_connections_per_host)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._sessions[host] = session
+            self._semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._sessions[host]
+
+    async def _download(self, url):
+        """Download (or revalidate) and parse a page."""
+        host = urlparse(url).netloc
+        session = self._session(host)
+        cached = self.disk_cache.get(url, None) if self.disk_cache else None
+
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with self._semaphores[host]:
+            try:
+                response = await asyncio.to_thread(session.get, url, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"Error fetching page {url}: {e}")
+                return None
+
+        if response.status_code == 304 and cached:
+            self.stats["revalidated"] += 1
+            html = cached["html"]
+        elif response.ok:
+            self.stats["downloaded"] += 1
+            html = response.text
+            if self.disk_cache:
+                self.disk_cache.set(url, {
+                    "html": html,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                })
+        else:
+            print(f"Error fetching page {url}: HTTP {response.status_code}")
+            return None
+
+        soup = await asyncio.to_thread(BeautifulSoup, html, "html.parser")
+        return {
+            "url": url,
+            "base_url": canonicalize_url(response.url),  # final URL after redirects
+            "html": html,
+            "soup": soup,
+            "hash": hashlib.sha256(html.encode("utf-8")).hexdigest(),
+        }
+
+    async def fetch(self, url):
+        """
+        Fetch a page, using the in-run cache when it was already requested.
+
+        :param url: Absolute URL.
+        :return: Page dictionary with 'url', 'base_url', 'html', 'soup' and 'hash', or None on failure.
+        """
+        url = canonicalize_url(url)
+        task = self.pages.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download(url))
+            self.pages[url] = task
+        elif url in self._prefetched:
+            self._prefetched.discard(url)
+            self.stats["prefetch_hits"] += 1
+        else:
+            self.stats["memory_hits"] += 1
+        return await task
+
+    def cached_page(self, url):
+        """Return an already fetched page without waiting or fetching, or None."""
+        task = self.pages.get(canonicalize_url(url))
+        if task is None or not task.done() or task.cancelled():
+            return None
+        return task.result()
+
+    def prefetch(self, urls, host=None):
+        """
+        Start fetching pages in the background without waiting for them.
+
+        A later fetch of a prefetched URL awaits the running download (or returns the
+        finished page) and counts as a prefetch hit. Binary files, and with `host` links
+        to other hosts, are skipped as in `crawl`.
+
+        :param urls: URLs likely to be requested soon.
+        :param host: Optional host (netloc) prefetched URLs must be on.
+        """
+        for url in urls:
+            url = canonicalize_url(url)
+            if url not in self.pages and is_crawlable(url, host):
+                self.pages[url] = asyncio.ensure_future(self._download(url))
+                self._prefetched.add(url)
+                self.stats["prefetched"] += 1
+
+    def prefetch_hit_rate(self):
+        """Share of prefetched pages that were requested afterwards."""
+        return self.stats["prefetch_hits"] / self.stats["prefetched"] if self.stats["prefetched"] else 0.0
+
+    async def crawl(self, start_url, max_pages=200, same_host=True):
+        """
+        Crawl a site breadth-first, fetching each level concurrently.
+
+        :param start_url: URL to start from.
+        :param max_pages: Maximum number of URLs to visit.
+        :param same_host: Only follow links on the start URL's host.
+        :return: Dictionary mapping canonical URLs to pages, in BFS order.
+        """
+        start_url = canonicalize_url(start_url)
+        host = urlparse(start_url).netloc
+        seen = {start_url}
+        frontier = [start_url]
+        pages = {}
+        while frontier:
+            next_frontier = []
+            for page in await asyncio.gather(*(self.fetch(url) for url in frontier)):
+                if not page:
+                    continue
+                pages[page["url"]] = page
+                for _, url in page_links(page):
+                    if url in seen or len(seen) >= max_pages or not is_crawlable(url, host if same_host else None):
+                        continue
+                    seen.add(url)
+                    next_frontier.append(url)
+            frontier = next_frontier
+        return pages
+
+    async def close(self):
+        """Wait for outstanding downloads (including unused prefetches), then close all pooled sessions."""
+        pending = [task for task in self.pages.values() if not task.done()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for session in self._sessions.values():
+            session.close()
@@ -0,0 +1,410 @@
+# Standard library imports
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Third-party imports
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+# Local imports
+from utilities.config import AI_DEVS_API_KEY
+
+
+class DatabaseClient:
+    """
+    A client for the AIDevs `database` task API, which runs MySQL queries over HTTP.
+    Uses a pooled session so several queries can be in flight at once.
+    """
+
+    def __init__(self, api_url, api_key=AI_DEVS_API_KEY, task_name="database", max_workers=8):
+        """
+        Initialize the DatabaseClient.
+
+        :param api_url: URL of the database API endpoint.
+        :param api_key: Authentication key for the API.
+        :param task_name: Task name sent with every query.
+        :param max_workers: Maximum number of concurrent queries.
+        """
+        self.api_url = api_url
+        self.api_key = api_key
+        self.task_name = task_name
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def query(self, sql):
+        """
+        Run a single query.
+
+        :param sql: SQL query to execute.
+        :return: List of row dictionaries or None if the request or query fails.
+        """
+        payload = {"task": self.task_name, "apikey": self.api_key, "query": sql}
+        try:
+            response = self.session.post(self.api_url, json=payload)
+            response.raise_for_status()
+            result = response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error running query '{sql}': {e}")
+            return None
+
+        if "reply" not in result or result["reply"] is None:
+            print(f"Query '{sql}' failed: {result.get('error', result)}")
+            return None
+        return result["reply"]
+
+    def query_many(self, queries):
+        """
+        Run several queries concurrently.
+
+        :param queries: List of SQL queries.
+        :return: List of replies in the same order as the queries (None for failures).
+        """
+        if not queries:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(queries))) as executor:
+            return list(executor.map(self.query, queries))
+
+    def show_tables(self):
+        """Return the list of table names or None if the query fails."""
+        reply = self.query("show tables")
+        if reply is None:
+            return None
+        # The reply key depends on the database name (e.g. 'Tables_in_banan')
+        return [next(iter(row.values())) for row in reply]
+
+    def column_definitions(self):
+        """
+        Return the column definitions of the current database from information_schema.
+
+        :return: Sorted list of (table, ordinal position, column, column type, nullable,
+                 default, key) tuples or None if the query fails.
+        """
+        reply = self.query(
+            "SELECT table_name AS t, ordinal_position AS p, column_name AS c, column_type AS ct, "
+            "is_nullable AS n, column_default AS d, column_key AS k "
+            "FROM information_schema.columns WHERE table_schema = DATABASE()"
+        )
+        if reply is None:
+            return None
+        return sorted(
+            tuple(str(row.get(name)) for name in ("t", "p", "c", "ct", "n", "d", "k")) for row in reply
+        )
+
+    def show_create_tables(self, tables):
+        """
+        Fetch `show create table` output for several tables concurrently.
+
+        :param tables: List of table names.
+        :return: Dictionary mapping table name to its CREATE TABLE statement.
+        """
+        replies = self.query_many([f"show create table {table}" for table in tables])
+        structures = {}
+        for table, reply in zip(tables, replies):
+            if reply:
+                row = reply[0]
+                structures[table] = row.get("Create Table") or list(row.values())[-1]
+        return structures
+
+    def count_rows(self, tables):
+        """
+        Count rows of several tables concurrently.
+
+        :param tables: List of table names.
+        :return: Dictionary mapping table name to row count or None if any query fails.
+        """
+        replies = self.query_many([f"SELECT COUNT(*) AS n FROM `{table}`" for table in tables])
+        if any(not reply for reply in replies):
+            return None
+        return {table: int(reply[0]["n"]) for table, reply in zip(tables, replies)}
+
+    def fetch_columns(self, table, columns, key, dtypes=None, page_size=1000, partitions=None):
+        """
+        Fetch a whole table as columnar arrays using keyset pagination.
+
+        The range of the first key column is split into partitions that are paged
+        concurrently; each page is decoded straight into NumPy arrays.
+
+        :param table: Table name.
+        :param columns: List of columns to fetch.
+        :param key: Column name or list of column names that uniquely orders the rows.
+        :param dtypes: Optional dictionary mapping column name to a NumPy dtype (default: object).
+        :param page_size: Number of rows per request.
+        :param partitions: Number of key ranges fetched concurrently (defaults to max_workers).
+        :return: Dictionary mapping column name to a NumPy array or None if any page fails.
+        """
+        key_columns = [key] if isinstance(key, str) else list(key)
+        selected = list(columns) + [c for c in key_columns if c not in columns]
+
+        bounds = self.query(f"SELECT MIN(`{key_columns[0]}`) AS lo, MAX(`{key_columns[0]}`) AS hi FROM `{table}`")
+        if bounds is None:
+            return None
+        try:
+            lo, hi = int(bounds[0]["lo"]), int(bounds[0]["hi"])
+        except TypeError:
+            # Empty table
+            return rows_to_columns([], columns, dtypes)
+        except ValueError:
+            # Non-numeric key, the range cannot be split
+            lo, hi, partitions = None, None, 1
+
+        ranges = [None]
+        if lo is not None:
+            partitions = partitions or self.max_workers
+            step = max(1, -(-(hi - lo + 1) // partitions))
+            ranges = [(start, min(start + step, hi + 1)) for start in range(lo, hi + 1, step)]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ranges))) as executor:
+            parts = list(executor.map(
+                lambda key_range: self._fetch_range(table, selected, key_columns, key_range, page_size, dtypes),
+                ranges
+            ))
+        if any(part is None for part in parts):
+            return None
+        return {column: np.concatenate([part[column] for part in parts]) for column in columns}
+
+    def _fetch_range(self, table, selected, key_columns, key_range, page_size, dtypes):
+        """Page through one key range and return its columns as arrays."""
+        select = ", ".join(f"`{c}`" for c in selected)
+        keys = ", ".join(f"`{c}`" for c in key_columns)
+        pages, last = [], None
+        while True:
+            conditions = []
+            if key_range:
+                conditions.append(f"`{key_columns[0]}` >= {key_range[0]} AND `{key_columns[0]}` < {key_range[1]}")
+            if last:
+                conditions.append(f"({keys}) > ({', '.join(_sql_literal(v) for v in last)})")
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+            page = self.query(f"SELECT {select} FROM `{table}`{where} ORDER BY {keys} LIMIT {page_size}")
+            if page is None:
+                return None
+            if page:
+                pages.append(rows_to_columns(page, selected, dtypes))
+                last = [page[-1][c] for c in key_columns]
+            if len(page) < page_size:
+                break
+
+        if not pages:
+            return rows_to_columns([], selected, dtypes)
+        return {column: np.concatenate([page[column] for page in pages]) for column in selected}
+
+
+def _sql_literal(value):
+    """Render a value returned by the API as a SQL literal."""
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.lstrip("-").isdigit()):
+        return str(value)
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def rows_to_columns(rows, columns, dtypes=None):
+    """
+    Convert a list of row dictionaries into columnar NumPy arrays.
+
+    :param rows: List of row dictionaries as returned by the database API.
+    :param columns: List of columns to extract.
+    :param dtypes: Optional dictionary mapping column name to a NumPy dtype (default: object).
+    :return: Dictionary mapping column name to a NumPy array.
+    """
+    dtypes = dtypes or {}
+    return {
+        column: np.array([row[column] for row in rows], dtype=object).astype(dtypes.get(column, object))
+        for column in columns
+    }
+
+
+# =========================================================
+# DDL parsing
+# =========================================================
+_COLUMN_RE = re.compile(r"^`(?P<name>[^`]+)`\s+(?P<type>[a-z]+(?:\([^)]*\))?(?:\s+unsigned)?)(?P<rest>.*)$", re.IGNORECASE)
+_DEFAULT_RE = re.compile(r"DEFAULT\s+('(?:[^']|'')*'|\S+)", re.IGNORECASE)
+_KEY_RE = re.compile(r"^(?P<kind>PRIMARY|UNIQUE)?\s*KEY\s*(?:`(?P<name>[^`]+)`)?\s*\((?P<columns>[^)]*)\)", re.IGNORECASE)
+_FOREIGN_KEY_RE = re.compile(
+    r"FOREIGN KEY\s*\((?P<columns>[^)]*)\)\s*REFERENCES\s*`?(?P<ref_table>[^`\s(]+)`?\s*\((?P<ref_columns>[^)]*)\)",
+    re.IGNORECASE
+)
+
+
+def _split_columns(columns):
+    """Split a backtick-quoted column list like '`a`,`b`(10)' into names."""
+    return [re.sub(r"\(\d+\)$", "", c.strip()).strip("`") for c in columns.split(",") if c.strip()]
+
+
+def parse_create_table(ddl):
+    """
+    Parse a MySQL CREATE TABLE statement into columns, keys and foreign keys.
+
+    :param ddl: CREATE TABLE statement as returned by `show create table`.
+    :return: Dictionary with 'columns', 'primary_key', 'keys' and 'foreign_keys'.
+    """
+    columns, primary_key, keys, foreign_keys = [], [], [], []
+
+    body = ddl[ddl.find("(") + 1:ddl.rfind(")")]
+    for line in body.split("\n"):
+        line = line.strip().rstrip(",")
+        if not line:
+            continue
+
+        column_match = _COLUMN_RE.match(line)
+        if column_match:
+            rest = column_match.group("rest")
+            default_match = _DEFAULT_RE.search(rest)
+            columns.append({
+                "name": column_match.group("name"),
+                "type": column_match.group("type").lower(),
+                "nullable": "NOT NULL" not in rest.upper(),
+                "default": default_match.group(1) if default_match else None,
+                "auto_increment": "AUTO_INCREMENT" in rest.upper(),
+            })
+            continue
+
+        foreign_match = _FOREIGN_KEY_RE.search(line)
+        if foreign_match:
+            foreign_keys.append({
+                "columns": _split_columns(foreign_match.group("columns")),
+                "ref_table": foreign_match.group("ref_table"),
+                "ref_columns": _split_columns(foreign_match.group("ref_columns")),
+            })
+            continue
+
+        key_match = _KEY_RE.match(line)
+        if key_match:
+            key_columns = _split_columns(key_match.group("columns"))
+            kind = (key_match.group("kind") or "").upper()
+            if kind == "PRIMARY":
+                primary_key = key_columns
+            else:
+                keys.append({
+                    "name": key_match.group("name"),
+                    "columns": key_columns,
+                    "unique": kind == "UNIQUE",
+                })
+
+    return {
+        "columns": columns,
+        "primary_key": primary_key,
+        "keys": keys,
+        "foreign_keys": foreign_keys,
+    }
+
+
+# =========================================================
+# Schema catalog
+# =========================================================
+class SchemaCatalog:
+    """
+    A persistent catalog of parsed table structures.
+
+    The catalog is stored as JSON. Within the TTL it is used without any network
+    calls; after the TTL only the table list and the column definitions from
+    information_schema are queried, and the table structures are re-fetched when
+    their fingerprint has changed (a new or dropped table, or an ALTER TABLE).
+    """
+
+    def __init__(self, db_client, path, ttl=24 * 3600):
+        """
+        Initialize the SchemaCatalog.
+
+        :param db_client: DatabaseClient used to introspect the schema.
+        :param path: Path of the JSON file holding the catalog.
+        :param ttl: Number of seconds the catalog is trusted without revalidation.
+        """
+        self.db_client = db_client
+        self.path = path
+        self.ttl = ttl
+        self.tables = {}
+
+    @staticmethod
+    def fingerprint(tables, columns):
+        """
+        Compute a fingerprint of the table names and their column definitions.
+
+        :param tables: List of table names.
+        :param columns: Column definitions from DatabaseClient.column_definitions.
+        :return: Hex digest or None when the column definitions are unknown.
+        """
+        if columns is None:
+            return None
+        digest = hashlib.sha256("\n".join(sorted(tables)).encode("utf-8"))
+        for column in columns:
+            digest.update("\t".join(column).encode("utf-8") + b"\n")
+        return digest.hexdigest()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable schema catalog {self.path}: {e}")
+            return None
+
+    def _write(self, fingerprint):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "fetched_at": time.time(), "tables": self.tables}, f, indent=2)
+
+    def load(self, force_refresh=False):
+        """
+        Load the catalog, refreshing it from the database when needed.
+
+        :param force_refresh: Re-fetch all table structures regardless of TTL and fingerprint.
+        :return: Dictionary mapping table name to its parsed structure, None if the table
+                 list cannot be read, or False if some structures could not be fetched
+                 (a partial catalog is never persisted).
+        """
+        cached = None if force_refresh else self._read()
+        if cached and time.time() - cached.get("fetched_at", 0) < self.ttl:
+            self.tables = cached["tables"]
+            return self.tables
+
+        tables = self.db_client.show_tables()
+        if tables is None:
+            # Fall back to a stale catalog rather than failing outright
+            if cached:
+                self.tables = cached["tables"]
+                return self.tables
+            return None
+
+        # Without column definitions the fingerprint is unknown and the structures are always re-fetched
+        fingerprint = self.fingerprint(tables, self.db_client.column_definitions())
+        if cached and fingerprint is not None and cached.get("fingerprint") == fingerprint:
+            self.tables = cached["tables"]
+        else:
+            ddls = self.db_client.show_create_tables(tables)
+            if len(ddls) != len(tables):
+                missing = sorted(set(tables) - set(ddls))
+                print(f"Could not fetch the structure of tables: {', '.join(missing)}")
+                return False
+            self.tables = {table: {**parse_create_table(ddl), "ddl": ddl} for table, ddl in ddls.items()}
+        self._write(fingerprint)
+        return self.tables
+
+    def to_prompt(self):
+        """
+        Render the catalog as a compact schema description for LLM prompts.
+
+        :return: One line per table plus one line per foreign key.
+        """
+        lines = []
+        for table, info in self.tables.items():
+            columns = []
+            for column in info["columns"]:
+                flags = " PK" if column["name"] in info["primary_key"] else ""
+                columns.append(f"{column['name']} {column['type']}{flags}")
+            lines.append(f"{table}({', '.join(columns)})")
+            for key in info["foreign_keys"]:
+                lines.append(
+                    f"FK {table}.{','.join(key['columns'])} -> {key['ref_table']}.{','.join(key['ref_columns'])}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,329 @@
+# Standard library imports
+import json
+import os
+import time
+from collections import OrderedDict
+
+# Third-party imports
+import numpy as np
+
+
+class CSRGraph:
+    """
+    A graph stored in compressed sparse row form.
+
+    Neighbors of node `n` are `indices[indptr[n]:indptr[n + 1]]`. Nodes are the
+    integer ids used in the edge arrays, so ids should be reasonably dense.
+    All searches are level-synchronous and vectorized with NumPy.
+    """
+
+    def __init__(self, indptr, indices, directed=True):
+        """
+        Initialize the CSRGraph.
+
+        :param indptr: Array of length num_nodes + 1 with row offsets into `indices`.
+        :param indices: Array of neighbor ids.
+        :param directed: Whether edges are one-way.
+        """
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.directed = directed
+        self._reverse = None
+
+    @property
+    def num_nodes(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(cls, src, dst, num_nodes=None, directed=True):
+        """
+        Build a graph from parallel arrays of edge endpoints.
+
+        :param src: Array of source node ids.
+        :param dst: Array of target node ids.
+        :param num_nodes: Number of nodes (defaults to the highest id + 1).
+        :param directed: If False, every edge is also added in the opposite direction.
+        :return: CSRGraph instance.
+        """
+        src = np.asarray(src, dtype=np.int32)
+        dst = np.asarray(dst, dtype=np.int32)
+        if not directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        if num_nodes is None:
+            num_nodes = int(max(src.max(initial=-1), dst.max(initial=-1))) + 1
+
+        order = np.argsort(src, kind="stable")
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
+        return cls(indptr, dst[order], directed=directed)
+
+    def neighbors(self, node):
+        """Return the neighbor ids of a node."""
+        if node < 0 or node >= self.num_nodes:
+            return self.indices[:0]
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def reverse(self):
+        """Return the graph with all edges reversed (the graph itself if undirected)."""
+        if not self.directed:
+            return self
+        if self._reverse is None:
+            src = np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.indptr))
+            self._reverse = CSRGraph.from_edges(self.indices, src, num_nodes=self.num_nodes)
+            self._reverse._reverse = self
+        return self._reverse
+
+    def _expand(self, frontier):
+        """Return (neighbors, parents) for all edges leaving the frontier."""
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return self.indices[:0], frontier[:0]
+        # Position of every outgoing edge: start of its row plus its offset within the row
+        row_offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        positions = row_offsets + np.arange(total, dtype=np.int64)
+        return self.indices[positions], np.repeat(frontier, counts)
+
+    def _step(self, frontier, parent, dist, level):
+        """Expand one BFS level in place and return the newly discovered nodes."""
+        neighbors, sources = self._expand(frontier)
+        unseen = parent[neighbors] == -1
+        neighbors, first = np.unique(neighbors[unseen], return_index=True)
+        parent[neighbors] = sources[unseen][first]
+        dist[neighbors] = level
+        return neighbors
+
+    def bfs(self, sources, targets=None):
+        """
+        Run a multi-source BFS.
+
+        :param sources: Node id or iterable of node ids to start from.
+        :param targets: Optional node ids; the search stops once all of them are reached.
+        :return: Tuple (dist, parent) of int32 arrays; unreached nodes have -1 in both,
+                 sources are their own parent.
+        """
+        sources = np.unique(np.atleast_1d(np.asarray(sources, dtype=np.int32)))
+        sources = sources[(sources >= 0) & (sources < self.num_nodes)]
+        parent = np.full(self.num_nodes, -1, dtype=np.int32)
+        dist = np.full(self.num_nodes, -1, dtype=np.int32)
+        parent[sources] = sources
+        dist[sources] = 0
+
+        pending = None
+        if targets is not None:
+            pending = np.atleast_1d(np.asarray(targets, dtype=np.int32))
+            pending = pending[(pending >= 0) & (pending < self.num_nodes)]
+
+        frontier, level = sources, 0
+        while len(frontier):
+            if pending is not None:
+                pending = pending[dist[pending] == -1]
+                if not len(pending):
+                    break
+            level += 1
+            frontier = self._step(frontier, parent, dist, level)
+        return dist, parent
+
+    @staticmethod
+    def path_from_parents(parent, target):
+        """
+        Reconstruct the path ending at `target` from a BFS parent array.
+
+        :return: List of node ids from the source to the target, or [] if unreached.
+        """
+        if target < 0 or target >= len(parent) or parent[target] == -1:
+            return []
+        path = [int(target)]
+        while parent[path[-1]] != path[-1]:
+            path.append(int(parent[path[-1]]))
+        return path[::-1]
+
+    def shortest_path(self, start, goal):
+        """Find a shortest path with a single-direction parent-pointer BFS."""
+        _, parent = self.bfs(start, targets=goal)
+        return self.path_from_parents(parent, goal)
+
+    def bidirectional_shortest_path(self, start, goal):
+        """
+        Find a shortest path by searching from both ends, always expanding the smaller frontier.
+
+        :return: List of node ids from start to goal, or [] if there is no path.
+        """
+        if not (0 <= start < self.num_nodes and 0 <= goal < self.num_nodes):
+            return []
+        if start == goal:
+            return [int(start)]
+
+        sides = []
+        for graph, origin in ((self, start), (self.reverse(), goal)):
+            parent = np.full(self.num_nodes, -1, dtype=np.int32)
+            dist = np.full(self.num_nodes, -1, dtype=np.int32)
+            parent[origin] = origin
+            dist[origin] = 0
+            sides.append({"graph": graph, "parent": parent, "dist": dist,
+                          "frontier": np.array([origin], dtype=np.int32), "level": 0})
+        forward, backward = sides
+
+        while len(forward["frontier"]) and len(backward["frontier"]):
+            side, other = (forward, backward) if len(forward["frontier"]) <= len(backward["frontier"]) else (backward, forward)
+            side["level"] += 1
+            side["frontier"] = side["graph"]._step(side["frontier"], side["parent"], side["dist"], side["level"])
+
+            meeting = side["frontier"][other["dist"][side["frontier"]] != -1]
+            if len(meeting):
+                meet = int(meeting[np.argmin(other["dist"][meeting])])
+                head = self.path_from_parents(forward["parent"], meet)
+                tail = self.path_from_parents(backward["parent"], meet)[::-1]
+                return head + tail[1:]
+        return []
+
+
+class ShortestPathCache:
+    """
+    Answers shortest-path queries from cached BFS trees.
+
+    One full BFS is run per distinct source and its parent array is kept in an
+    LRU cache, so repeated or batched queries from the same source are answered
+    from memory.
+    """
+
+    def __init__(self, graph, max_sources=128):
+        """
+        Initialize the ShortestPathCache.
+
+        :param graph: CSRGraph to search.
+        :param max_sources: Maximum number of BFS trees kept in memory.
+        """
+        self.graph = graph
+        self.max_sources = max_sources
+        self.trees = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def tree(self, source):
+        """Return the BFS parent array rooted at `source`."""
+        if source in self.trees:
+            self.hits += 1
+            self.trees.move_to_end(source)
+            return self.trees[source]
+
+        self.misses += 1
+        _, parent = self.graph.bfs(source)
+        self.trees[source] = parent
+        if len(self.trees) > self.max_sources:
+            self.trees.popitem(last=False)
+        return parent
+
+    def path(self, start, goal):
+        """Return a shortest path from start to goal, or [] if there is none."""
+        return CSRGraph.path_from_parents(self.tree(start), goal)
+
+    def paths(self, pairs):
+        """
+        Answer a batch of (start, goal) queries, running at most one BFS per distinct start.
+
+        :param pairs: Iterable of (start, goal) node id pairs.
+        :return: List of paths in the same order as the pairs.
+        """
+        pairs = list(pairs)
+        by_start = {}
+        for index, (start, goal) in enumerate(pairs):
+            by_start.setdefault(start, []).append((index, goal))
+
+        results = [None] * len(pairs)
+        for start, queries in by_start.items():
+            parent = self.tree(start)
+            for index, goal in queries:
+                results[index] = CSRGraph.path_from_parents(parent, goal)
+        return results
+
+
+# =========================================================
+# Snapshots
+# =========================================================
+def save_snapshot(path, graph, id_to_name, fingerprint):
+    """
+    Persist a graph as `<path>.npz` plus a JSON name index.
+
+    :param path: Snapshot path without extension.
+    :param graph: CSRGraph to save.
+    :param id_to_name: Dictionary mapping node id to name.
+    :param fingerprint: JSON-serializable value describing the source data (e.g. row counts).
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    np.savez(f"{path}.npz", indptr=graph.indptr, indices=graph.indices, directed=graph.directed)
+    with open(f"{path}.json", "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "id_to_name": id_to_name}, f, ensure_ascii=False)
+
+
+def load_snapshot(path, fingerprint=None):
+    """
+    Load a graph snapshot saved by `save_snapshot`.
+
+    :param path: Snapshot path without extension.
+    :param fingerprint: Expected fingerprint; the snapshot is ignored if it differs.
+    :return: Tuple (graph, id_to_name) or None if the snapshot is missing or stale.
+    """
+    if not (os.path.exists(f"{path}.npz") and os.path.exists(f"{path}.json")):
+        return None
+    try:
+        with open(f"{path}.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if fingerprint is not None and meta["fingerprint"] != fingerprint:
+            return None
+        with np.load(f"{path}.npz") as arrays:
+            graph = CSRGraph(arrays["indptr"], arrays["indices"], directed=bool(arrays["directed"]))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable graph snapshot {path}: {e}")
+        return None
+    return graph, {int(node): name for node, name in meta["id_to_name"].items()}
+
+
+def benchmark(num_nodes=1_000_000, num_edges=5_000_000, queries=20, seed=42):
+    """
+    Time graph construction and searches on a random synthetic graph.
+
+    :param num_nodes: Number of nodes.
+    :param num_edges: Number of directed edges.
+    :param queries: Number of random start/goal pairs to search.
+    :param seed: Random seed.
+    """
+    rng = np.random.default_rng(seed)
+    src = rng.integers(0, num_nodes, num_edges, dtype=np.int32)
+    dst = rng.integers(0, num_nodes, num_edges, dtype=np.int32)
+    pairs = rng.integers(0, num_nodes, (queries, 2))
+
+    started = time.perf_counter()
+    graph = CSRGraph.from_edges(src, dst, num_nodes=num_nodes)
+    graph.reverse()
+    print(f"Build: {num_nodes:,} nodes, {num_edges:,} edges in {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    graph.bfs(0)
+    print(f"Full BFS from one source: {time.perf_counter() - started:.2f}s")
+
+    for name, search in (("parent-pointer BFS", graph.shortest_path),
+                         ("bidirectional BFS", graph.bidirectional_shortest_path)):
+        started = time.perf_counter()
+        lengths = [len(search(int(a), int(b))) for a, b in pairs]
+        elapsed = time.perf_counter() - started
+        print(f"{name}: {queries} queries in {elapsed:.2f}s ({elapsed / queries * 1000:.1f} ms/query), "
+              f"mean path length {np.mean(lengths):.1f}")
+
+    cache = ShortestPathCache(graph)
+    batch = [(int(pairs[i % 4][0]), int(b)) for i, (_, b) in enumerate(pairs)]
+    started = time.perf_counter()
+    cache.paths(batch)
+    elapsed = time.perf_counter() - started
+    print(f"cached BFS trees: {queries} queries from 4 sources in {elapsed:.2f}s ({cache.misses} BFS runs)")
+
+
+if __name__ == "__main__":
+    benchmark()
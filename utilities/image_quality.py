@@ -0,0 +1,119 @@
+# Standard library imports
+import io
+
+# Third-party imports
+import numpy as np
+from PIL import Image, ImageFilter
+
+# Images are downscaled before analysis; the metrics are stable well below full resolution
+ANALYSIS_SIZE = 512
+
+# Decision thresholds. They are conservative starting points, not calibrated on a labelled
+# set: only strong signals are decided locally, everything else goes to the vision model
+DARK_MEAN = 0.25            # mean luminance (0-1) below which an image is too dark
+DARK_MEAN_AMBIGUOUS = 0.35
+BRIGHT_MEAN = 0.75          # mean luminance above which an image is too bright
+BRIGHT_MEAN_AMBIGUOUS = 0.65
+CLIP_RATIO = 0.2            # share of crushed/blown pixels that confirms dark/bright
+NOISE_LEVEL = 12.0          # mean absolute difference from a 3x3 median filter
+NOISE_AMBIGUOUS = 7.0
+GLITCH_ROWS = 0.05          # share of rows with abrupt discontinuities (scanline damage)
+GLITCH_AMBIGUOUS = 0.02
+BAND_ROWS = 8               # height of the row bands damage is looked for in, at ANALYSIS_SIZE
+BAND_NOISE_LEVEL = 20.0     # noise in the noisiest band (damage confined to a strip)
+BAND_NOISE_AMBIGUOUS = 10.0
+MAX_SHIFT = 32              # largest horizontal band displacement searched for, in pixels
+
+
+def image_metrics(image_bytes):
+    """
+    Compute luminance, clipping, noise and corruption metrics for an image.
+
+    :param image_bytes: Encoded image (PNG, JPEG, ...).
+    :return: Dictionary of metrics.
+    """
+    image = Image.open(io.BytesIO(image_bytes)).convert("L")
+    image.thumbnail((ANALYSIS_SIZE, ANALYSIS_SIZE))
+    luminance = np.asarray(image, dtype=np.float32)
+
+    histogram = np.bincount(luminance.astype(np.uint8).ravel(), minlength=256) / luminance.size
+    median = np.asarray(image.filter(ImageFilter.MedianFilter(3)), dtype=np.float32)
+
+    # Scanline damage shows up as rows that differ far more from their neighbor than usual
+    row_jumps = np.abs(np.diff(luminance, axis=0)).mean(axis=1)
+    typical_jump = np.median(row_jumps) + 1.0
+
+    # Damage confined to a strip disappears in whole-image means, so noise is also taken per band
+    row_noise = np.abs(luminance - median).mean(axis=1)
+    bands = max(1, len(row_noise) // BAND_ROWS)
+    band_noise = max(band.mean() for band in np.array_split(row_noise, bands)) if len(row_noise) else 0.0
+
+    return {
+        "mean": float(luminance.mean() / 255),
+        "dark_clip": float(histogram[:16].sum()),
+        "bright_clip": float(histogram[240:].sum()),
+        "noise": float(row_noise.mean()) if len(row_noise) else 0.0,
+        "band_noise": float(band_noise),
+        "glitch_rows": float((row_jumps > 6 * typical_jump).mean()) if len(row_jumps) else 0.0,
+        "shifted_rows": shifted_rows(luminance, typical_jump),
+    }
+
+
+def shifted_rows(luminance, typical_jump):
+    """
+    Count row transitions explained by a horizontal displacement (the edge of a shifted band).
+
+    A transition counts when it is clearly stronger than usual and shifting the next row by
+    a few pixels makes it match the previous one at least three times better than without
+    shifting.
+
+    :param luminance: 2-D luminance array.
+    :param typical_jump: Typical mean absolute difference between neighboring rows.
+    :return: Number of shifted transitions.
+    """
+    height, width = luminance.shape
+    margin = min(MAX_SHIFT, width // 4)
+    if height < 2 or margin < 2:
+        return 0
+    upper = luminance[:-1, margin:width - margin]
+    errors = np.stack([
+        np.abs(upper - luminance[1:, margin + shift:width - margin + shift]).mean(axis=1)
+        for shift in range(-margin, margin + 1)
+    ])
+    unshifted = errors[margin]
+    best = errors.argmin(axis=0) - margin
+    shifted = (np.abs(best) >= 2) & (errors.min(axis=0) * 3 < unshifted) & (unshifted > 3 * typical_jump)
+    return int(shifted.sum())
+
+
+def triage(image_bytes):
+    """
+    Pick a correction command from local image metrics.
+
+    :param image_bytes: Encoded image.
+    :return: Tuple (decision, metrics) where decision is 'REPAIR', 'BRIGHTEN', 'DARKEN',
+             'OK' when the image looks fine, or None when the metrics are ambiguous.
+    """
+    try:
+        metrics = image_metrics(image_bytes)
+    except (OSError, ValueError) as e:
+        print(f"Error analyzing image locally: {e}")
+        return None, {}
+
+    if (metrics["glitch_rows"] >= GLITCH_ROWS or metrics["noise"] >= NOISE_LEVEL
+            or metrics["band_noise"] >= BAND_NOISE_LEVEL):
+        return "REPAIR", metrics
+    if metrics["mean"] <= DARK_MEAN and metrics["dark_clip"] >= CLIP_RATIO:
+        return "BRIGHTEN", metrics
+    if metrics["mean"] >= BRIGHT_MEAN and metrics["bright_clip"] >= CLIP_RATIO:
+        return "DARKEN", metrics
+
+    ambiguous = (
+        metrics["glitch_rows"] >= GLITCH_AMBIGUOUS
+        or metrics["noise"] >= NOISE_AMBIGUOUS
+        or metrics["band_noise"] >= BAND_NOISE_AMBIGUOUS
+        or metrics["shifted_rows"] > 0  # a displaced band, or a pattern that looks like one
+        or metrics["mean"] <= DARK_MEAN_AMBIGUOUS
+        or metrics["mean"] >= BRIGHT_MEAN_AMBIGUOUS
+    )
+    return (None if ambiguous else "OK"), metrics
@@ -0,0 +1,88 @@
+# Third-party imports
+import numpy as np
+
+# Local imports
+from utilities.crawler import canonicalize_url
+
+# Elements whose text is used as the context of a link
+_CONTEXT_TAGS = ["p", "li", "td", "dd", "section", "article", "div"]
+
+
+def link_contexts(page, context_chars=200):
+    """
+    List the links on a page with the text surrounding them.
+
+    :param page: Page dictionary returned by Crawler.fetch.
+    :param context_chars: Maximum characters of surrounding text per link.
+    :return: List of (anchor text, URL, context) tuples in document order, without duplicate URLs.
+    """
+    links, seen = [], set()
+    for link in page["soup"].find_all("a"):
+        href = link.get("href")
+        if not href or href.startswith(("mailto:", "tel:", "javascript:")):
+            continue
+        url = canonicalize_url(href, page["base_url"])
+        if url in seen:
+            continue
+        seen.add(url)
+        container = link.find_parent(_CONTEXT_TAGS)
+        context = container.get_text(" ", strip=True)[:context_chars] if container else ""
+        links.append((link.get_text(" ", strip=True), url, context))
+    return links
+
+
+class LinkRanker:
+    """
+    Ranks the links of a page by embedding similarity to a question.
+
+    The question, the page text and every link (anchor text, URL and surrounding text)
+    are embedded in one cached batch request, and links are ranked by cosine similarity
+    to the question. The page's own score tells whether the page itself is a better
+    match than anything it links to.
+    """
+
+    def __init__(self, client_openai, model="text-embedding-3-small", max_page_chars=8000):
+        """
+        Initialize the LinkRanker.
+
+        :param client_openai: OpenAIClient, ideally with an embedding cache.
+        :param model: Embedding model.
+        :param max_page_chars: Characters of page text that are embedded.
+        """
+        self.client_openai = client_openai
+        self.model = model
+        self.max_page_chars = max_page_chars
+
+    def rank(self, question, page_text, links):
+        """
+        Score a page and rank its links against a question.
+
+        :param question: Question text.
+        :param page_text: Text of the current page.
+        :param links: List of (anchor text, URL, context) tuples, e.g. from link_contexts.
+        :return: Tuple (page score, [(score, anchor text, URL), ...] best first), or
+                 (None, []) when the embeddings could not be created.
+        """
+        texts = [question, page_text[:self.max_page_chars] or "(empty page)"]
+        texts += [f"{text}\n{url}\n{context}".strip() for text, url, context in links]
+        embeddings = self.client_openai.create_embeddings_batch(texts, model=self.model)
+        if any(embedding is None for embedding in embeddings):
+            return None, []
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        scores = vectors[1:] @ vectors[0]
+        ranked = sorted(
+            ((float(score), text, url) for score, (text, url, _) in zip(scores[1:], links)),
+            key=lambda item: -item[0]
+        )
+        return float(scores[0]), ranked
+
+    @staticmethod
+    def margin(ranked):
+        """Score difference between the best and second-best link (infinite with a single link)."""
+        if not ranked:
+            return 0.0
+        if len(ranked) == 1:
+            return float("inf")
+        return ranked[0][0] - ranked[1][0]
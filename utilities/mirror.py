@@ -0,0 +1,206 @@
+# Standard library imports
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# Local imports
+from utilities.database import SchemaCatalog
+
+
+def sqlite_type(mysql_type):
+    """
+    Map a MySQL column type to the matching SQLite type affinity.
+
+    :param mysql_type: Column type as parsed from the DDL (e.g. 'int(11)', 'varchar(20)').
+    :return: SQLite type name.
+    """
+    base = mysql_type.split("(")[0].split()[0].lower()
+    if "int" in base or base in ("bit", "bool", "boolean"):
+        return "INTEGER"
+    if base in ("decimal", "numeric", "float", "double", "real"):
+        return "REAL"
+    if "blob" in base or "binary" in base:
+        return "BLOB"
+    return "TEXT"
+
+
+def translate_create_table(table, info):
+    """
+    Translate a parsed MySQL table structure into a SQLite CREATE TABLE statement.
+
+    :param table: Table name.
+    :param info: Parsed structure as stored in the SchemaCatalog.
+    :return: SQLite CREATE TABLE statement.
+    """
+    definitions = [f'"{column["name"]}" {sqlite_type(column["type"])}' for column in info["columns"]]
+    if info["primary_key"]:
+        primary_key = ", ".join(f'"{c}"' for c in info["primary_key"])
+        definitions.append(f"PRIMARY KEY ({primary_key})")
+    for key in info["foreign_keys"]:
+        columns = ", ".join(f'"{c}"' for c in key["columns"])
+        ref_columns = ", ".join(f'"{c}"' for c in key["ref_columns"])
+        definitions.append(f'FOREIGN KEY ({columns}) REFERENCES "{key["ref_table"]}" ({ref_columns})')
+    return f'CREATE TABLE "{table}" ({", ".join(definitions)})'
+
+
+class LocalMirror:
+    """
+    A local SQLite copy of the remote database API.
+
+    Every table is paged into a SQLite file once; afterwards generated queries can be
+    validated and executed locally without a network round trip per attempt.
+    """
+
+    def __init__(self, db_client, catalog_path, path, ttl=24 * 3600, page_size=1000):
+        """
+        Initialize the LocalMirror.
+
+        :param db_client: DatabaseClient used to copy the remote tables.
+        :param catalog_path: Path of the SchemaCatalog JSON file.
+        :param path: Path of the SQLite mirror file.
+        :param ttl: Number of seconds after which the mirror is rebuilt.
+        :param page_size: Number of rows fetched per remote query.
+        """
+        self.db_client = db_client
+        self.catalog = SchemaCatalog(db_client, catalog_path, ttl=ttl)
+        self.path = path
+        self.ttl = ttl
+        self.page_size = page_size
+        self.connection = None
+
+    @staticmethod
+    def schema_hash(tables):
+        """Compute a hash of the parsed table structures."""
+        return hashlib.sha256(json.dumps(tables, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _read_meta(self, key):
+        try:
+            row = self.connection.execute("SELECT value FROM _mirror_meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def _is_fresh(self, schema_hash):
+        fetched_at = self._read_meta("fetched_at")
+        return (
+            self._read_meta("schema_hash") == schema_hash
+            and fetched_at is not None
+            and time.time() - float(fetched_at) < self.ttl
+        )
+
+    def _fetch_rows(self, table, info):
+        """Page through a remote table and return its rows as tuples."""
+        names = [column["name"] for column in info["columns"]]
+        if info["primary_key"]:
+            columns = self.db_client.fetch_columns(table, names, info["primary_key"], page_size=self.page_size)
+            if columns is None:
+                raise RuntimeError(f"Failed to copy table {table}")
+            return list(zip(*(columns[name].tolist() for name in names)))
+
+        # Without a key the table can only be paged by offset
+        rows, offset = [], 0
+        while True:
+            page = self.db_client.query(
+                f"SELECT * FROM `{table}` ORDER BY `{names[0]}` LIMIT {self.page_size} OFFSET {offset}"
+            )
+            if page is None:
+                raise RuntimeError(f"Failed to copy table {table}")
+            rows.extend(tuple(row.get(name) for name in names) for row in page)
+            if len(page) < self.page_size:
+                return rows
+            offset += self.page_size
+
+    def build(self, force_refresh=False):
+        """
+        Open the mirror, copying the remote tables when it is missing or stale.
+
+        :param force_refresh: Rebuild the mirror even if it is fresh.
+        :return: True if the mirror is ready, False otherwise.
+        """
+        tables = self.catalog.load(force_refresh=force_refresh)
+        if not tables:
+            return False
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+
+        schema_hash = self.schema_hash(tables)
+        if not force_refresh and self._is_fresh(schema_hash):
+            return True
+
+        print(f"Building local mirror {self.path}...")
+        try:
+            with self.connection:
+                existing = self.connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                ).fetchall()
+                for (name,) in existing:
+                    self.connection.execute(f'DROP TABLE "{name}"')
+                self.connection.execute("CREATE TABLE _mirror_meta (key TEXT PRIMARY KEY, value TEXT)")
+                for table, info in tables.items():
+                    rows = self._fetch_rows(table, info)
+                    self.connection.execute(translate_create_table(table, info))
+                    placeholders = ", ".join("?" for _ in info["columns"])
+                    self.connection.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', rows)
+                    print(f"Mirrored {table}: {len(rows)} rows")
+                self.connection.executemany(
+                    "INSERT INTO _mirror_meta (key, value) VALUES (?, ?)",
+                    [("schema_hash", schema_hash), ("fetched_at", str(time.time()))]
+                )
+        except (RuntimeError, sqlite3.Error) as e:
+            print(f"Error building local mirror: {e}")
+            return False
+        return True
+
+    def validate(self, sql):
+        """
+        Check a query against the mirror with EXPLAIN, without running it.
+
+        :param sql: SQL query to validate.
+        :return: Error message or None if the query is valid.
+        """
+        try:
+            self.connection.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            return None
+        except sqlite3.Error as e:
+            return str(e)
+
+    def query(self, sql):
+        """
+        Run a query against the mirror.
+
+        :param sql: SQL query to execute.
+        :return: List of row dictionaries (like the remote API reply) or None on error.
+        """
+        try:
+            return [dict(row) for row in self.connection.execute(sql).fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error running local query '{sql}': {e}")
+            return None
+
+    def query_with_retry(self, generate_sql, max_attempts=3):
+        """
+        Generate, validate and run a query locally, feeding errors back to the generator.
+
+        :param generate_sql: Callable taking (previous_sql, error) and returning a new SQL query.
+        :param max_attempts: Maximum number of generation attempts.
+        :return: Tuple (sql, rows) for the first query that runs, or (last_sql, None).
+        """
+        sql, error = None, None
+        for attempt in range(1, max_attempts + 1):
+            sql = generate_sql(sql, error)
+            if not sql:
+                return None, None
+            error = self.validate(sql)
+            if error is None:
+                rows = self.query(sql)
+                if rows is not None:
+                    return sql, rows
+                error = "Query failed during execution"
+            print(f"Attempt {attempt}: query rejected by local mirror: {error}")
+        return sql, None
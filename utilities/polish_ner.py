@@ -0,0 +1,240 @@
+# Standard library imports
+import re
+
+# Local imports
+from utilities.text import normalize_key
+
+# =========================================================
+# Gazetteers (nominative case)
+# =========================================================
+FIRST_NAMES = [
+    # Female
+    "Agata", "Agnieszka", "Aleksandra", "Alicja", "Aneta", "Angelika", "Anna", "Barbara", "Beata",
+    "Bożena", "Danuta", "Dorota", "Edyta", "Elżbieta", "Ewa", "Ewelina", "Grażyna", "Halina",
+    "Helena", "Irena", "Iwona", "Jadwiga", "Janina", "Joanna", "Jolanta", "Julia", "Justyna",
+    "Karolina", "Katarzyna", "Kinga", "Krystyna", "Lena", "Magdalena", "Maja", "Małgorzata",
+    "Maria", "Marta", "Martyna", "Monika", "Natalia", "Olga", "Patrycja", "Paulina", "Renata",
+    "Sylwia", "Teresa", "Urszula", "Weronika", "Wiktoria", "Zofia", "Zuzanna",
+    # Male
+    "Adam", "Adrian", "Aleksander", "Andrzej", "Antoni", "Arkadiusz", "Artur", "Azazel", "Bartosz",
+    "Bogdan", "Cezary", "Damian", "Daniel", "Dariusz", "Dawid", "Dominik", "Filip", "Grzegorz",
+    "Henryk", "Hubert", "Igor", "Jacek", "Jakub", "Jan", "Janusz", "Jarosław", "Jerzy", "Józef",
+    "Kacper", "Kamil", "Karol", "Kazimierz", "Konrad", "Krzysztof", "Leszek", "Łukasz", "Maciej",
+    "Marcin", "Marek", "Mariusz", "Mateusz", "Michał", "Mikołaj", "Paweł", "Piotr", "Przemysław",
+    "Rafał", "Robert", "Roman", "Ryszard", "Sebastian", "Sławomir", "Stanisław", "Stefan",
+    "Szymon", "Tadeusz", "Tomasz", "Wiesław", "Witold", "Władysław", "Wojciech", "Zbigniew",
+    "Zenon", "Zygfryd",
+]
+
+CITIES = [
+    "Białystok", "Bielsko-Biała", "Bydgoszcz", "Chełm", "Ciechanów", "Częstochowa", "Elbląg",
+    "Frombork", "Gdańsk", "Gdynia", "Gliwice", "Gniezno", "Gorzów Wielkopolski", "Grudziądz",
+    "Kalisz", "Katowice", "Kielce", "Konin", "Koszalin", "Kraków", "Legnica", "Lublin", "Łódź",
+    "Malbork", "Olsztyn", "Opole", "Płock", "Poznań", "Przemyśl", "Radom", "Rzeszów", "Siedlce",
+    "Słupsk", "Sopot", "Suwałki", "Szczecin", "Tarnów", "Toruń", "Wałbrzych", "Warszawa",
+    "Włocławek", "Wrocław", "Zakopane", "Zamość", "Zielona Góra",
+]
+
+# Forms the suffix rules cannot derive
+IRREGULAR_FORMS = {
+    "Białystok": ["Białegostoku", "Białymstoku"],
+    "Bielsko-Biała": ["Bielska-Białej", "Bielsku-Białej"],
+    "Bydgoszcz": ["Bydgoszczy", "Bydgoszczą"],
+    "Łódź": ["Łodzi", "Łodzią"],
+    "Radom": ["Radomiu"],
+    "Sopot": ["Sopotu"],
+    "Suwałki": ["Suwałk", "Suwałkach", "Suwałkami"],
+    "Wrocław": ["Wrocławiu"],
+    "Zakopane": ["Zakopanego", "Zakopanem", "Zakopanemu"],
+    "Zamość": ["Zamościa", "Zamościu", "Zamościem"],
+    "Zielona Góra": ["Zielonej Góry", "Zielonej Górze", "Zieloną Górę", "Zieloną Górą"],
+    "Gorzów Wielkopolski": ["Gorzowa Wielkopolskiego", "Gorzowie Wielkopolskim"],
+}
+
+# Capitalized words that are never entities
+STOPWORDS = {"PAN", "PANI", "PANA", "PANEM", "PANU", "PROFESOR", "PROFESORA", "DOKTOR", "AI", "BNW"}
+
+# Common Polish function words and adverbs, capitalized mostly at a sentence start (folded)
+FUNCTION_WORDS = {
+    "ABY", "ALE", "ALBO", "BEZ", "BO", "BYC", "BYL", "BYLA", "BYLEM", "BYLAM", "BYLI", "BYLO", "CHOC", "CHOCIAZ",
+    "CHYBA", "CO", "CZASAMI", "CZASEM", "CZESTO", "CZY", "DLA", "DLATEGO", "DO", "DOPIERO", "DZIS", "DZISIAJ",
+    "GDY", "GDYZ", "GDZIE", "ICH", "JA", "JAK", "JAKI", "JAKO", "JEDEN", "JEDNA", "JEDNAK", "JEDNO", "JEGO",
+    "JEJ", "JEST", "JESTEM", "JESLI", "JESZCZE", "JEZELI", "JUZ", "JUTRO", "KAZDY", "KIEDY", "KIEDYS", "KILKA",
+    "KTO", "KTORA", "KTORE", "KTORY", "KTORZY", "MIEDZY", "MIMO", "MOJ", "MOJA", "MOZE", "MY", "NA", "NAD",
+    "NAGLE", "NAJPIERW", "NASTEPNIE", "NASZ", "NASZA", "NATOMIAST", "NIE", "NIESTETY", "NIGDY", "NIKT", "NIC",
+    "OBECNIE", "OCZYWISCIE", "OD", "ON", "ONA", "ONE", "ONI", "ONO", "OSTATNIO", "PO", "POD", "PODCZAS",
+    "PODOBNO", "POTEM", "POZA", "POZNIEJ", "PONIEWAZ", "PRAWDOPODOBNIE", "PRZED", "PRZEZ", "PRZY", "ROWNIEZ",
+    "SA", "SIE", "STAD", "TA", "TAK", "TAKZE", "TAM", "TE", "TEGO", "TEJ", "TEN", "TERAZ", "TEZ", "TO", "TU",
+    "TUTAJ", "TY", "TYM", "WCZESNIEJ", "WCZORAJ", "WEDLUG", "WIEC", "WIELE", "WOWCZAS", "WRESZCIE", "WSZYSCY",
+    "WSZYSTKO", "WTEDY", "WY", "ZA", "ZATEM", "ZAWSZE", "ZE", "ZEBY", "ZNOW", "ZNOWU",
+}
+
+# Past-tense and impersonal verb endings; a sentence-initial word ending so is not a name (folded)
+VERB_ENDINGS = ("ANO", "ONO", "LEM", "LAM", "LES", "LAS", "LISMY", "LYSMY", "LISCIE", "LI", "LY", "LO")
+
+# Locative/dative endings after the final consonant of a stem
+_SOFT_ENDINGS = {
+    "r": "rze", "t": "cie", "d": "dzie", "n": "nie", "m": "mie", "b": "bie", "p": "pie", "w": "wie",
+    "s": "sie", "z": "zie", "f": "fie", "ł": "le", "k": "ce", "g": "dze", "l": "li", "j": "i",
+}
+_VELAR_OR_HARD = ("k", "g", "ch", "j", "sz", "cz", "rz", "ż", "c", "dz", "l", "ń", "ś", "ź")
+_WORD_RE = re.compile(r"[A-ZĄĆĘŁŃÓŚŹŻ][a-ząćęłńóśźż]+(?:-[A-ZĄĆĘŁŃÓŚŹŻ][a-ząćęłńóśźż]+)?")
+
+
+def _feminine_forms(lemma):
+    """Forms of nouns ending in -a (Barbara, Warszawa, Maria)."""
+    stem = lemma[:-1]
+    if stem.endswith("i"):
+        return [stem + "i", stem + "ę", stem + "ą", stem + "o"]
+    if stem.endswith(("k", "g", "l", "j")):
+        genitive = stem[:-1] + "i" if stem.endswith("j") else stem + "i"
+    else:
+        genitive = stem + "y"
+    locative = next((stem[:-len(c)] + e for c, e in _SOFT_ENDINGS.items() if stem.endswith(c)), genitive)
+    return [genitive, locative, stem + "ę", stem + "ą", stem + "o"]
+
+
+def _masculine_stem(lemma):
+    """Drop the fleeting 'e' (Marek -> Mark, Paweł -> Pawł, Aleksander -> Aleksandr)."""
+    for suffix in ("ek", "eł", "er"):
+        if lemma.endswith(suffix) and len(lemma) > 4:
+            return lemma[:-2] + suffix[1]
+    if lemma.endswith("ów"):
+        return lemma[:-2] + "ow"
+    if lemma.endswith("ń"):
+        return lemma[:-1] + "ni"
+    return lemma
+
+
+def _masculine_forms(lemma):
+    """Forms of nouns ending in a consonant (Adam, Rafał, Kraków, Gdańsk)."""
+    if lemma.endswith(("y", "i")):
+        # Adjectival declension (Jerzy, Antoni)
+        stem = lemma[:-1] if lemma.endswith("y") else lemma
+        return [stem + "ego", stem + "emu", lemma + "m"]
+    stem = _masculine_stem(lemma)
+    instrumental = stem + ("iem" if stem.endswith(("k", "g")) else "em")
+    forms = [stem + "a", stem + "owi", instrumental, stem + "u"]
+    if not stem.endswith(_VELAR_OR_HARD):
+        forms += [stem[:-len(c)] + e for c, e in _SOFT_ENDINGS.items() if stem.endswith(c)][:1]
+    return forms
+
+
+def _plural_forms(lemma):
+    """Forms of plural city names (Katowice, Kielce, Siedlce)."""
+    stem = lemma[:-1]
+    return [stem, stem + "ach", stem + "om", stem + "ami"]
+
+
+def inflected_forms(lemma):
+    """
+    Generate the common declined forms of a first name or city name.
+
+    :param lemma: Name in nominative case.
+    :return: List of declined forms (may over-generate, never includes the lemma itself).
+    """
+    forms = list(IRREGULAR_FORMS.get(lemma, []))
+    if lemma.endswith("a"):
+        forms += _feminine_forms(lemma)
+    elif lemma.endswith("ce"):
+        forms += _plural_forms(lemma)
+    elif lemma.endswith(("o", "e")):
+        # Neuter (Gniezno, Opole)
+        stem = lemma[:-1]
+        forms += [stem + "a", stem + "u", stem + "em"] + [
+            stem[:-len(c)] + e for c, e in _SOFT_ENDINGS.items() if stem.endswith(c)][:1]
+    else:
+        forms += _masculine_forms(lemma)
+    return forms
+
+
+def build_lexicon():
+    """
+    Build a lookup table from normalized (folded, upper-case) word forms to entities.
+
+    :return: Dictionary mapping a normalized form to a tuple (kind, lemma) where kind is
+             'name' or 'city' and lemma is normalized too, or to None for forms shared by
+             several entities (Aleksandra is a name and the genitive of Aleksander).
+    """
+    candidates = {}
+    for kind, lemmas in (("name", FIRST_NAMES), ("city", CITIES)):
+        for lemma in lemmas:
+            for form in [lemma] + inflected_forms(lemma):
+                candidates.setdefault(normalize_key(form), set()).add((kind, normalize_key(lemma)))
+    return {form: next(iter(entries)) if len(entries) == 1 else None for form, entries in candidates.items()}
+
+
+LEXICON = build_lexicon()
+
+
+def _sentence_span(text, start, end):
+    """Return the (start, end) offsets of the sentence containing text[start:end]."""
+    boundaries = ".!?\n"
+    sentence_start = max(text.rfind(mark, 0, start) for mark in boundaries) + 1
+    ends = [position for position in (text.find(mark, end) for mark in boundaries) if position != -1]
+    return sentence_start, min(ends) + 1 if ends else len(text)
+
+
+def extract_entities(text, fallback=None):
+    """
+    Extract person first names and city names in nominative case without Polish characters.
+
+    Ambiguous forms (Aleksandra: a name, or the genitive of Aleksander) and unknown
+    capitalized tokens are left to the fallback. Function words, words that also appear
+    in lower case in the text, sentence-initial verbs and surnames (a capitalized word
+    right after a first name) are skipped, so the fallback only runs for truly unknown
+    words.
+
+    :param text: Text to analyze.
+    :param fallback: Optional callable taking a list of unknown or ambiguous tokens and the
+                     sentences they appear in, and returning a dictionary with 'names' and
+                     'cities' lists (e.g. an LLM classifier).
+    :return: Dictionary with sorted 'names', 'cities' and 'unknown' lists (upper-case, folded);
+             'unknown' also holds the ambiguous forms.
+    """
+    names, cities, unknown = set(), set(), set()
+    sentences = {}  # sentence span -> sentence, for the fallback
+    lower_case_words = {normalize_key(word) for word in re.findall(r"\b[a-ząćęłńóśźż]+\b", text)}
+    matches = list(_WORD_RE.finditer(text))
+    skip_next = False
+    previous_name_end = None
+    for index, match in enumerate(matches):
+        if skip_next:
+            skip_next = False
+            continue
+        after_name = previous_name_end is not None and text[previous_name_end:match.start()] == " "
+        previous_name_end = None
+
+        # Multi-word cities (Zielona Góra) are checked before single words
+        if index + 1 < len(matches) and text[match.end():matches[index + 1].start()] == " ":
+            bigram = LEXICON.get(normalize_key(f"{match.group()} {matches[index + 1].group()}"))
+            if bigram:
+                (names if bigram[0] == "name" else cities).add(bigram[1])
+                skip_next = True
+                continue
+
+        token = normalize_key(match.group())
+        entry = LEXICON.get(token)
+        ambiguous = entry is None and token in LEXICON
+        if entry:
+            (names if entry[0] == "name" else cities).add(entry[1])
+        if ambiguous or (entry and entry[0] == "name"):
+            previous_name_end = match.end()
+        if entry:
+            continue
+
+        preceding = text[:match.start()].rstrip()
+        sentence_start = not preceding or preceding[-1] in ".!?:\n\"'-"
+        common_word = (token in STOPWORDS or token in FUNCTION_WORDS or token in lower_case_words
+                       or (sentence_start and token.endswith(VERB_ENDINGS)))
+        if ambiguous or not (common_word or after_name):
+            unknown.add(token)
+            span = _sentence_span(text, match.start(), match.end())
+            sentences[span] = text[span[0]:span[1]].strip()
+
+    if unknown and fallback:
+        resolved = fallback(sorted(unknown), [sentences[span] for span in sorted(sentences)]) or {}
+        names.update(normalize_key(name) for name in resolved.get("names", []))
+        cities.update(normalize_key(city) for city in resolved.get("cities", []))
+
+    return {"names": sorted(names), "cities": sorted(cities), "unknown": sorted(unknown)}
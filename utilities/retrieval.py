@@ -0,0 +1,147 @@
+# Standard library imports
+import math
+import re
+from collections import Counter, defaultdict
+
+# Local imports
+from utilities.text import fold_diacritics
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def stem(word, stem_length=5):
+    """
+    Crudely stem a word by dropping up to two trailing letters and truncating it.
+
+    Works well enough for inflected languages like Polish: 'firma', 'firmy' and 'firmie'
+    all become 'firm', 'kontakt' and 'kontaktu' become 'konta'. Words of up to four
+    letters are kept whole.
+
+    :param word: Lower-case word.
+    :param stem_length: Maximum stem length.
+    :return: Stem.
+    """
+    return word[:min(stem_length, max(4, len(word) - 2))]
+
+
+def tokenize(text, stem_length=5):
+    """
+    Split text into lower-case, diacritic-free, stemmed terms.
+
+    :param text: Text to tokenize.
+    :param stem_length: Maximum term length passed to stem (None keeps whole words).
+    :return: List of terms.
+    """
+    words = _TOKEN_RE.findall(fold_diacritics(text).lower())
+    return [stem(word, stem_length) for word in words] if stem_length else words
+
+
+class BM25Index:
+    """
+    An in-memory Okapi BM25 index over short documents.
+
+    Documents are added with an identifier and their text; `search` returns the
+    identifiers of the best matching documents for a free-text query.
+    """
+
+    def __init__(self, k1=1.5, b=0.75, stem_length=5):
+        """
+        Initialize the BM25Index.
+
+        :param k1: Term frequency saturation.
+        :param b: Document length normalization.
+        :param stem_length: Term truncation passed to tokenize.
+        """
+        self.k1 = k1
+        self.b = b
+        self.stem_length = stem_length
+        self.documents = {}  # doc_id -> text
+        self.lengths = {}  # doc_id -> number of terms
+        self.postings = defaultdict(dict)  # term -> {doc_id: term frequency}
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, doc_id, text):
+        """
+        Index a document (re-adding an identifier replaces the document).
+
+        :param doc_id: Hashable document identifier.
+        :param text: Document text.
+        """
+        if doc_id in self.documents:
+            self.remove(doc_id)
+        terms = Counter(tokenize(text, self.stem_length))
+        self.documents[doc_id] = text
+        self.lengths[doc_id] = sum(terms.values())
+        for term, frequency in terms.items():
+            self.postings[term][doc_id] = frequency
+
+    def remove(self, doc_id):
+        """Remove a document from the index."""
+        self.documents.pop(doc_id, None)
+        self.lengths.pop(doc_id, None)
+        for term in [term for term, docs in self.postings.items() if doc_id in docs]:
+            del self.postings[term][doc_id]
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def search(self, query, k=5):
+        """
+        Rank documents against a query.
+
+        :param query: Free-text query.
+        :param k: Number of results.
+        :return: List of (doc_id, score) tuples, best first, only documents sharing a term.
+        """
+        if not self.documents:
+            return []
+        count = len(self.documents)
+        average_length = sum(self.lengths.values()) / count
+        scores = Counter()
+        for term in set(tokenize(query, self.stem_length)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, frequency in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / average_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores.most_common(k)
+
+
+def chunk_text(text, max_chars=1200, overlap=1):
+    """
+    Split text into chunks of whole paragraphs, each at most about `max_chars` long.
+
+    Paragraphs are separated by blank lines; a paragraph longer than `max_chars` is cut
+    at sentence ends (or hard, if it has none). Consecutive chunks share `overlap`
+    paragraphs so that answers spanning a boundary stay retrievable.
+
+    :param text: Text to split.
+    :param max_chars: Target maximum chunk length.
+    :param overlap: Number of trailing paragraphs repeated at the start of the next chunk.
+    :return: List of chunk strings.
+    """
+    paragraphs = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        while len(paragraph) > max_chars:
+            cut = max(paragraph.rfind(". ", 0, max_chars), paragraph.rfind("\n", 0, max_chars))
+            cut = cut + 1 if cut > max_chars // 2 else max_chars
+            paragraphs.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if paragraph:
+            paragraphs.append(paragraph)
+
+    chunks, current = [], []
+    for paragraph in paragraphs:
+        if current and sum(len(part) + 2 for part in current) + len(paragraph) > max_chars:
+            chunks.append("\n\n".join(current))
+            current = current[-overlap:] if overlap else []
+            if sum(len(part) + 2 for part in current) + len(paragraph) > max_chars:
+                current = []
+        current.append(paragraph)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
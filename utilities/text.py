@@ -0,0 +1,27 @@
+# Standard library imports
+import unicodedata
+
+# Letters that do not decompose under NFKD (e.g. 'ł') need an explicit mapping
+POLISH_LETTERS = str.maketrans("ąćęłńóśźżĄĆĘŁŃÓŚŹŻ", "acelnoszzACELNOSZZ")
+
+
+def fold_diacritics(text):
+    """
+    Replace Polish (and other accented) letters with their ASCII counterparts.
+
+    :param text: Text to fold.
+    :return: Text without diacritics, e.g. 'Kraków' -> 'Krakow'.
+    """
+    text = text.translate(POLISH_LETTERS)
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize_key(text):
+    """
+    Normalize a name or city for lookups and cache keys.
+
+    :param text: Name or city.
+    :return: Upper-case text without diacritics, e.g. 'Rafał' -> 'RAFAL'.
+    """
+    return fold_diacritics(text).strip().upper()
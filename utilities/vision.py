@@ -0,0 +1,134 @@
+# Standard library imports
+import hashlib
+import io
+import threading
+
+# Third-party imports
+import numpy as np
+from PIL import Image
+
+
+def dhash(image, hash_size=8):
+    """
+    Compute the difference hash of an image (sign of horizontal gradients).
+
+    :param image: PIL image.
+    :param hash_size: Hash side length; the hash has hash_size**2 bits.
+    :return: Hash as an integer.
+    """
+    pixels = np.asarray(image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS), dtype=np.float32)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def phash(image, hash_size=8, scale=4):
+    """
+    Compute the perceptual hash of an image (low DCT frequencies above their median).
+
+    :param image: PIL image.
+    :param hash_size: Hash side length; the hash has hash_size**2 bits.
+    :param scale: Oversampling factor of the image before the DCT.
+    :return: Hash as an integer.
+    """
+    size = hash_size * scale
+    pixels = np.asarray(image.convert("L").resize((size, size), Image.LANCZOS), dtype=np.float32)
+    n = np.arange(size)
+    dct = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+    low = (dct @ pixels @ dct.T)[:hash_size, :hash_size].ravel()
+    bits = low > np.median(low[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+class VisionCache:
+    """
+    Reuses vision model answers for repeated images.
+
+    Each request picks a cache mode:
+
+    - 'exact': reuse only for byte-identical images (SHA-256 of the encoded bytes);
+      the safe choice for reading or classifying documents, where two different scans
+      can look alike to a perceptual hash.
+    - 'near': additionally reuse for re-encoded copies, i.e. images with the same
+      perceptual hash (within `max_distance`) whose downscaled pixels differ by at most
+      `pixel_tolerance` on average; meant only for free-form descriptions.
+    - 'none': never cache, e.g. for quality triage, where the answer must change once
+      the image has been repaired even though it still hashes the same.
+    """
+
+    MODES = ("exact", "near", "none")
+
+    def __init__(self, max_distance=0, pixel_tolerance=2.0, hash_func=dhash):
+        """
+        Initialize the VisionCache.
+
+        :param max_distance: Maximum Hamming distance between hashes in 'near' mode.
+        :param pixel_tolerance: Maximum mean absolute difference (0-255) of 32x32 grayscale
+                                thumbnails in 'near' mode.
+        :param hash_func: Hash function taking a PIL image (dhash or phash).
+        """
+        self.max_distance = max_distance
+        self.pixel_tolerance = pixel_tolerance
+        self.hash_func = hash_func
+        self.exact = {}  # (prompt, sha256) -> result
+        self.entries = []  # (prompt, hash, thumbnail, result) for 'near' lookups
+        self.calls = 0
+        self.saved = 0
+        self._lock = threading.Lock()
+
+    def fingerprint(self, image_bytes):
+        """Return (hash, 32x32 grayscale thumbnail) of an encoded image or None if it cannot be decoded."""
+        try:
+            image = Image.open(io.BytesIO(image_bytes))
+            thumbnail = np.asarray(image.convert("L").resize((32, 32)), dtype=np.float32)
+            return self.hash_func(image), thumbnail
+        except (OSError, ValueError) as e:
+            print(f"Error hashing image: {e}")
+            return None
+
+    def _find_near(self, prompt, image_hash, thumbnail):
+        for entry_prompt, entry_hash, entry_thumbnail, result in self.entries:
+            if (entry_prompt == prompt
+                    and (entry_hash ^ image_hash).bit_count() <= self.max_distance
+                    and np.abs(entry_thumbnail - thumbnail).mean() <= self.pixel_tolerance):
+                return result
+        return None
+
+    def get_or_compute(self, image_bytes, prompt, compute, mode="exact"):
+        """
+        Return the cached answer for a repeated image or compute and store a new one.
+
+        :param image_bytes: Encoded image.
+        :param prompt: Prompt sent with the image.
+        :param compute: Callable performing the vision request and returning its answer.
+        :param mode: 'exact', 'near' or 'none' (see the class docstring).
+        :return: Cached or computed answer.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cache mode '{mode}', choose one of: {', '.join(self.MODES)}")
+        if mode == "none":
+            with self._lock:
+                self.calls += 1
+            return compute()
+
+        key = (prompt, hashlib.sha256(image_bytes).hexdigest())
+        fingerprint = self.fingerprint(image_bytes) if mode == "near" else None
+        with self._lock:
+            cached = self.exact.get(key)
+            if cached is None and fingerprint is not None:
+                cached = self._find_near(prompt, *fingerprint)
+            if cached is not None:
+                self.saved += 1
+                return cached
+            self.calls += 1
+
+        result = compute()
+        if result is not None:
+            with self._lock:
+                self.exact[key] = result
+                if fingerprint is not None:
+                    self.entries.append((prompt, *fingerprint, result))
+        return result
+
+    def report(self):
+        """Return a one-line summary of made and saved vision calls."""
+        return f"Vision calls: {self.calls} made, {self.saved} saved by image deduplication"